@@ -0,0 +1,93 @@
+# Vectorized board analysis on boolean NumPy masks.
+#
+# The board is a (height, width) mask of free cells. A breadth-first search from
+# many sources at once is repeated dilation of a stack of seed masks inside the
+# free cells, so the distance from every head to every cell comes out of a single
+# loop whose length is the longest shortest path, not the number of cells. Voronoi territory - the
+# cells a snake reaches strictly before everybody else - is a min/argmin over those
+# distance stacks.
+#
+# analyse_moves() does all of that for every candidate move of ours in one batched
+# pass. NumPy is optional (pip install numpy): without it ENABLED is False and the
+# callers keep their plain behaviour.
+
+import typing
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from board import Board, OccupiedType
+
+ENABLED = np is not None
+UNREACHED = 32767
+
+class MoveAnalysis(typing.NamedTuple):
+    area: int  # free cells we can still reach after the move
+    territory: int  # cells we reach strictly before every opponent
+
+def board_mask(board: Board) -> "np.ndarray":
+    cells = np.frombuffer(bytes(board.cells), dtype=np.uint8)
+    return (cells < OccupiedType.SNAKE_BODY).reshape(board.height, board.width)
+
+# Steps from the nearest seed cell to every cell through free cells, for a whole
+# stack of seed masks at once; UNREACHED where no path exists. `free` broadcasts
+# against `seeds`. Buffers are reused in place, as the loop is mostly NumPy call
+# overhead on boards this small.
+def distances(free: "np.ndarray", seeds: "np.ndarray") -> "np.ndarray":
+    dist = np.full(seeds.shape, UNREACHED, dtype=np.int16)
+    dist[seeds] = 0
+    unvisited = np.broadcast_to(free, seeds.shape) & ~seeds
+    frontier = seeds.copy()
+    grown = np.empty_like(seeds)
+    step = 0
+    while True:
+        grown[...] = frontier
+        grown[..., 1:, :] |= frontier[..., :-1, :]
+        grown[..., :-1, :] |= frontier[..., 1:, :]
+        grown[..., :, 1:] |= frontier[..., :, :-1]
+        grown[..., :, :-1] |= frontier[..., :, 1:]
+        grown &= unvisited
+        if not grown.any():
+            return dist
+        step += 1
+        np.putmask(dist, grown, step)
+        unvisited ^= grown
+        frontier, grown = grown, frontier
+
+# Cells each source (axis -3) reaches strictly first; ties belong to nobody
+def voronoi(dist: "np.ndarray") -> "np.ndarray":
+    best = dist.min(axis=-3, keepdims=True)
+    first = (dist == best) & (best < UNREACHED)
+    sole = first.sum(axis=-3, keepdims=True) == 1
+    return (first & sole).sum(axis=(-2, -1))
+
+# Area and territory for each candidate move, all in one batched pass.
+# `moves` maps a move name to the cell our head would land on; opponents are
+# still on their current heads, one step behind us.
+def analyse_moves(board: Board, head: int, moves: typing.Dict[str, int],
+                  opponent_heads: typing.Sequence[int]) -> typing.Dict[str, MoveAnalysis]:
+    if not moves:
+        return {}
+    height, width = board.height, board.width
+    names = list(moves)
+    k, n = len(names), len(opponent_heads) + 1
+
+    free = np.broadcast_to(board_mask(board), (k, height, width)).copy()
+    free[:, head // width, head % width] = False  # our head becomes our neck
+    seeds = np.zeros((k, n, height, width), dtype=bool)
+    for c, name in enumerate(names):
+        cell = moves[name]
+        free[c, cell // width, cell % width] = False
+        seeds[c, 0, cell // width, cell % width] = True
+    for s, opp in enumerate(opponent_heads, start=1):
+        seeds[:, s, opp // width, opp % width] = True
+
+    dist = distances(free[:, None], seeds)
+    # We are a step ahead: the opponents' distances count from the turn we're deciding
+    dist[:, 1:] = np.where(dist[:, 1:] < UNREACHED, dist[:, 1:] - 1, UNREACHED)
+    dist[:, 1:][seeds[:, 1:]] = 0
+    area = ((dist[:, 0] > 0) & (dist[:, 0] < UNREACHED)).sum(axis=(-2, -1))
+    territory = voronoi(dist)[:, 0]
+    return {name: MoveAnalysis(int(area[c]), int(territory[c])) for c, name in enumerate(names)}
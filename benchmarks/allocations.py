@@ -0,0 +1,61 @@
+# Allocation and GC pressure of the /move hot path.
+#
+# Reports the peak memory a call allocates (tracemalloc) and how many
+# generation-0 collections a burst of turns triggers.
+#
+# Run with: python -m benchmarks.allocations
+
+import gc
+import random
+import tracemalloc
+
+import main
+from benchmarks.boards import make_game_state
+
+CALLS = 200
+
+
+def peak_kb(fn) -> float:
+    # Mean high-water mark of traced memory during a call, above where the call
+    # started, in KiB: temporaries count even when they are freed before it returns
+    tracemalloc.start()
+    total = 0
+    for _ in range(CALLS):
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return total / CALLS / 1024
+
+
+def gen0_collections(fn, calls: int = 2000) -> int:
+    gc.collect()
+    before = gc.get_stats()[0]["collections"]
+    for _ in range(calls):
+        fn()
+    return gc.get_stats()[0]["collections"] - before
+
+
+def run():
+    state = make_game_state(width=11, height=11, snakes=4, food=10, seed=1)
+    ctx = main.getBoardContext(state)
+    src = main.Coord()
+    src.x, src.y = ctx.board.xy(ctx.head)
+    dest = main.Coord()
+    dest.x, dest.y = ctx.board.xy(ctx.food[0])
+    random.seed(0)
+
+    cases = [
+        ("getBoardCoords", lambda: main.getBoardCoords(state)),
+        ("a_star_search", lambda: main.a_star_search(ctx.board, src, dest)),
+        ("distance_field", lambda: main.distance_field(ctx.board, ctx.head)),
+        ("move", lambda: main.move(state)),
+    ]
+    print(f"{'case':<16} {'peak KB/call':>12} {'gen0 GCs/2000':>14}")
+    for name, fn in cases:
+        print(f"{name:<16} {peak_kb(fn):>12.1f} {gen0_collections(fn):>14}")
+
+
+if __name__ == "__main__":
+    run()
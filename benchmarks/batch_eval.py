@@ -0,0 +1,45 @@
+# Throughput of the batched evaluation API against one call per position.
+#
+# Scores the same positions three ways: evaluation.evaluate one position at a
+# time, evaluation.evaluate on whole batches, and (for scale) the search's own
+# pure-Python evaluate(), which only looks at a bounded flood fill.
+#
+# Run with: python -m benchmarks.batch_eval
+
+import time
+
+import evaluation
+import search
+from benchmarks.boards import make_game_state
+from position import Position
+
+POSITIONS = 512
+BATCH_SIZES = (1, 16, 64, 256, 512)
+
+
+def rate(fn, count: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def run():
+    if not evaluation.ENABLED:
+        print("numpy is not installed")
+        return
+
+    for size in (7, 11, 19):
+        positions = [
+            Position.from_game_state(make_game_state(width=size, height=size, snakes=4, food=6, seed=seed))
+            for seed in range(POSITIONS)
+        ]
+        print(f"{size}x{size}, {POSITIONS} positions")
+        print(f"  {'search.evaluate (pure Python)':<32} {rate(lambda: [search.evaluate(p) for p in positions], POSITIONS):>10.0f} positions/s")
+        for batch in BATCH_SIZES:
+            chunks = [positions[i:i + batch] for i in range(0, POSITIONS, batch)]
+            per_sec = rate(lambda: [evaluation.evaluate(chunk) for chunk in chunks], POSITIONS)
+            print(f"  {f'evaluation.evaluate, batch {batch}':<32} {per_sec:>10.0f} positions/s")
+
+
+if __name__ == "__main__":
+    run()
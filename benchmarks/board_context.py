@@ -0,0 +1,28 @@
+# Per-turn cost of main.move as the number of food items grows.
+#
+# The board context is built once per turn, so its cost should stay flat no
+# matter how much food is on the board.
+#
+# Run with: python -m benchmarks.board_context
+
+import random
+
+import main
+from benchmarks.boards import copies, make_game_state, timed
+
+FOOD_COUNTS = [0, 1, 5, 10, 20, 40]
+REPEAT = 200
+
+
+def run():
+    print(f"{'food':>6} {'context (us)':>14} {'move (us)':>12}")
+    for food in FOOD_COUNTS:
+        fresh = copies(make_game_state(width=11, height=11, snakes=4, food=food, seed=1))
+        random.seed(0)
+        ctx_us = timed(lambda: main.getBoardContext(fresh()), REPEAT)
+        move_us = timed(lambda: main.move(fresh()), REPEAT)
+        print(f"{food:>6} {ctx_us:>14.1f} {move_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    run()
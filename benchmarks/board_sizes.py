@@ -0,0 +1,31 @@
+# Per-size latency of the board build, a single search and a full move.
+#
+# Everything is sized from the request, so small maps should be proportionally
+# cheaper and large custom maps (19x19, 25x25) must work at all.
+#
+# Run with: python -m benchmarks.board_sizes
+
+import random
+
+import main
+from benchmarks.boards import copies, make_game_state, timed
+
+SIZES = [7, 11, 19, 25]
+REPEAT = 200
+
+
+def run():
+    print(f"{'size':>6} {'board (us)':>12} {'bfs (us)':>10} {'move (us)':>11}")
+    for size in SIZES:
+        state = make_game_state(width=size, height=size, snakes=4, food=size // 2, seed=1)
+        fresh = copies(state)
+        ctx = main.getBoardContext(state)
+        random.seed(0)
+        board_us = timed(lambda: main.getBoardCoords(fresh()), REPEAT)
+        bfs_us = timed(lambda: main.distance_field(ctx.board, ctx.head), REPEAT)
+        move_us = timed(lambda: main.move(fresh()), REPEAT)
+        print(f"{f'{size}x{size}':>6} {board_us:>12.1f} {bfs_us:>10.1f} {move_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    run()
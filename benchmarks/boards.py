@@ -0,0 +1,97 @@
+# Synthetic board states for the benchmarks.
+#
+# Every state is a complete /move payload (same shape the Battlesnake engine
+# sends), generated from a fixed seed so runs are comparable with each other.
+
+import random
+import typing
+
+GameState = typing.Dict[str, typing.Any]
+
+DIRECTIONS = [(0, 1), (0, -1), (-1, 0), (1, 0)]
+
+
+def _grow_snake(rng: random.Random, taken: typing.Set[typing.Tuple[int, int]],
+                width: int, height: int, length: int) -> typing.List[typing.Dict[str, int]]:
+    # Random self-avoiding walk; gives up early (shorter snake) when boxed in.
+    free = [(x, y) for x in range(width) for y in range(height) if (x, y) not in taken]
+    if not free:
+        return []
+    cur = rng.choice(free)
+    body = [cur]
+    taken.add(cur)
+    while len(body) < length:
+        options = []
+        for dx, dy in DIRECTIONS:
+            nxt = (cur[0] + dx, cur[1] + dy)
+            if 0 <= nxt[0] < width and 0 <= nxt[1] < height and nxt not in taken:
+                options.append(nxt)
+        if not options:
+            break
+        cur = rng.choice(options)
+        body.append(cur)
+        taken.add(cur)
+    return [{"x": x, "y": y} for x, y in body]
+
+
+def make_game_state(width: int = 11, height: int = 11, snakes: int = 4,
+                    snake_length: int = 6, food: int = 5, seed: int = 0) -> GameState:
+    rng = random.Random(seed)
+    taken: typing.Set[typing.Tuple[int, int]] = set()
+
+    snake_list = []
+    for i in range(snakes):
+        body = _grow_snake(rng, taken, width, height, snake_length)
+        if len(body) < 2:
+            continue
+        snake_list.append({
+            "id": f"snake-{i}",
+            "name": f"snake-{i}",
+            "health": 90,
+            "body": body,
+            "head": body[0],
+            "length": len(body),
+            "latency": "0",
+            "shout": "",
+        })
+
+    free = [(x, y) for x in range(width) for y in range(height) if (x, y) not in taken]
+    rng.shuffle(free)
+    food_list = [{"x": x, "y": y} for x, y in free[:food]]
+
+    return {
+        "game": {
+            "id": f"bench-{width}x{height}-{seed}",
+            "ruleset": {"name": "standard", "version": "v1.0.0"},
+            "map": "standard",
+            "timeout": 500,
+            "source": "custom",
+        },
+        "turn": 10,
+        "board": {
+            "width": width,
+            "height": height,
+            "food": food_list,
+            "hazards": [],
+            "snakes": snake_list,
+        },
+        "you": snake_list[0],
+    }
+
+
+# Hands out deep copies of `state` in turn (made up front, outside any timing), so
+# timed calls get distinct payload objects the way real requests do
+def copies(state: GameState, count: int = 64) -> typing.Callable[[], GameState]:
+    import copy
+    import itertools
+    states = itertools.cycle([copy.deepcopy(state) for _ in range(count)])
+    return lambda: next(states)
+
+
+def timed(fn: typing.Callable[[], typing.Any], repeat: int) -> float:
+    # Mean wall time per call in microseconds.
+    import time
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
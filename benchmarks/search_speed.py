@@ -0,0 +1,43 @@
+# Throughput of the search engines: make/unmake cost, minimax nodes per second
+# and MCTS playouts per second.
+#
+# Run with: python -m benchmarks.search_speed
+
+import random
+
+import mcts
+import search
+from benchmarks.boards import make_game_state, timed
+from position import Position
+
+BUDGET_MS = 200
+
+
+def run():
+    state = make_game_state(width=11, height=11, snakes=4, food=6, seed=3)
+    pos = Position.from_game_state(state)
+    rng = random.Random(0)
+    moves = [[rng.randrange(4) for _ in pos.bodies] for _ in range(64)]
+    i = [0]
+
+    def make_unmake():
+        i[0] = (i[0] + 1) & 63
+        pos.unmake(pos.make(moves[i[0]]))
+
+    print(f"make+unmake: {timed(make_unmake, 20000):.2f} us")
+    print(f"{'snakes':>6} {'depth':>6} {'nodes':>8} {'nodes/s':>10}")
+    for snakes in (1, 2, 4):
+        state = make_game_state(width=11, height=11, snakes=snakes, food=6, seed=3)
+        result = search.iterative_deepening(state, budget_ms=BUDGET_MS)
+        rate = result.nodes / (result.elapsed_ms / 1000.0)
+        print(f"{snakes:>6} {result.depth:>6} {result.nodes:>8} {rate:>10.0f}")
+
+    print(f"{'snakes':>6} {'playouts':>9} {'playouts/s':>11}")
+    for snakes in (1, 2, 4):
+        state = make_game_state(width=11, height=11, snakes=snakes, food=6, seed=3)
+        result = mcts.run(state, budget_ms=BUDGET_MS, seed=0)
+        print(f"{snakes:>6} {result.playouts:>9} {result.playouts_per_sec:>11.0f}")
+
+
+if __name__ == "__main__":
+    run()
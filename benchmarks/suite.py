@@ -0,0 +1,181 @@
+# Micro-benchmark suite for the /move hot paths, with stored baselines.
+#
+# Times getBoardCoords, a_star_search, the full main.move and the example snakes'
+# flood_fill_size / min_dist_to_points helpers on a fixed set of boards (empty,
+# crowded, many-food, 7x7, 11x11, 19x19, plus optional recorded turns) and
+# reports ops/sec and the peak memory allocated per call.
+#
+# --save writes the results as the baseline; later runs compare against it and
+# flag every case that got slower (or peaks higher) than the threshold allows.
+# Baselines are machine-specific, so keep them out of version control.
+#
+# Run with: python -m benchmarks.suite [--save] [--recorded recordings/] [--only move]
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import typing
+
+import analysis
+import main
+import recorder
+from benchmarks.allocations import peak_kb
+from benchmarks.boards import GameState, copies, make_game_state
+from examples import dodge, hungry
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+MIN_TIME_S = 0.2  # per timing round
+ROUNDS = 3  # best round wins
+RECORDED_STATES = 8
+
+BOARDS: typing.Dict[str, typing.Callable[[], GameState]] = {
+    "empty": lambda: make_game_state(width=11, height=11, snakes=1, snake_length=3, food=0, seed=1),
+    "crowded": lambda: make_game_state(width=11, height=11, snakes=8, snake_length=12, food=3, seed=2),
+    "many-food": lambda: make_game_state(width=11, height=11, snakes=4, food=40, seed=3),
+    "7x7": lambda: make_game_state(width=7, height=7, snakes=2, snake_length=4, food=3, seed=4),
+    "11x11": lambda: make_game_state(width=11, height=11, snakes=4, food=5, seed=5),
+    "19x19": lambda: make_game_state(width=19, height=19, snakes=4, snake_length=10, food=10, seed=6),
+}
+
+def recorded_boards(path: str, count: int = RECORDED_STATES) -> typing.Dict[str, typing.Callable[[], GameState]]:
+    states = [record["request"] for record in recorder.read_records(path)]
+    if not states:
+        return {}
+    step = max(len(states) // count, 1)
+    return {
+        f"recorded-{i}": (lambda state=state: state)
+        for i, state in enumerate(states[::step][:count])
+    }
+
+def cases_for(state: GameState) -> typing.Dict[str, typing.Callable[[], typing.Any]]:
+    ctx = main.getBoardContext(state)
+    w, h = ctx.board.width, ctx.board.height
+    src = main.Coord()
+    src.x, src.y = ctx.board.xy(ctx.head)
+    dest = main.Coord()
+    dest.x, dest.y = ctx.board.xy(ctx.food[0]) if ctx.food else (w - 1 - src.x, h - 1 - src.y)
+
+    you = state["you"]
+    head = you["head"]
+    blocked = dodge.all_body_cells(state)
+    blocked.discard((head["x"], head["y"]))
+    heads = dodge.opponent_heads(state, you["id"]) + state["board"]["food"]
+
+    # Cases that decode the payload get a distinct copy per call, like real requests
+    fresh = copies(state)
+    cases = {
+        "getBoardCoords": lambda: main.getBoardCoords(fresh()),
+        "a_star_search": lambda: main.a_star_search(ctx.board, src, dest),
+        "move": lambda: main.move(fresh()),
+        "dodge.flood_fill_size": lambda: dodge.flood_fill_size(head, blocked, w, h),
+        "dodge.min_dist_to_points": lambda: dodge.min_dist_to_points(head, heads),
+        "hungry.flood_fill_size": lambda: hungry.flood_fill_size(head, blocked, w, h),
+    }
+    if analysis.ENABLED:
+        cases["space_by_move"] = lambda: main.space_by_move(ctx)
+    return cases
+
+# Calls per second, best of ROUNDS rounds of at least MIN_TIME_S each
+def ops_per_sec(fn: typing.Callable[[], typing.Any]) -> float:
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        if time.perf_counter() - start >= MIN_TIME_S / 10:
+            break
+        calls *= 2
+    calls = max(int(calls * 10), 1)
+
+    best = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = max(best, calls / (time.perf_counter() - start))
+    return best
+
+def run_suite(boards: typing.Dict[str, typing.Callable[[], GameState]],
+              only: typing.Optional[typing.List[str]] = None) -> typing.Dict[str, typing.Dict[str, float]]:
+    results = {}
+    for board_name, make_state in boards.items():
+        state = make_state()
+        for case_name, fn in cases_for(state).items():
+            if only and case_name not in only:
+                continue
+            random.seed(0)
+            results[f"{board_name}/{case_name}"] = {
+                "ops_per_sec": ops_per_sec(fn),
+                "peak_kb": peak_kb(fn),
+            }
+    return results
+
+# Cases slower than baseline by more than `threshold` (a fraction), or peaking
+# that much (and half a KiB) higher, are returned as regressions. Baselines
+# saved before peak_kb existed are only compared on speed.
+def compare(results: typing.Dict[str, typing.Dict[str, float]], baseline: typing.Dict[str, typing.Dict[str, float]],
+            threshold: float) -> typing.List[str]:
+    regressions = []
+    print(f"{'case':<40} {'ops/s':>12} {'baseline':>12} {'change':>8} {'peak KB':>8} {'baseline':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<40} {result['ops_per_sec']:>12.0f} {'-':>12} {'':>8} {result['peak_kb']:>8.1f} {'-':>9}")
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1.0 if base["ops_per_sec"] else 0.0
+        slower = change < -threshold
+        base_peak = base.get("peak_kb")
+        higher_peak = base_peak is not None and result["peak_kb"] > base_peak * (1 + threshold) + 0.5
+        flag = "  REGRESSION" if slower or higher_peak else ""
+        if flag:
+            regressions.append(name)
+        base_peak_text = f"{base_peak:.1f}" if base_peak is not None else "-"
+        print(f"{name:<40} {result['ops_per_sec']:>12.0f} {base['ops_per_sec']:>12.0f} {change * 100:>+7.1f}% "
+              f"{result['peak_kb']:>8.1f} {base_peak_text:>9}{flag}")
+    return regressions
+
+def report(results: typing.Dict[str, typing.Dict[str, float]]):
+    print(f"{'case':<40} {'ops/s':>12} {'peak KB/call':>12}")
+    for name, result in results.items():
+        print(f"{name:<40} {result['ops_per_sec']:>12.0f} {result['peak_kb']:>12.1f}")
+
+def run():
+    parser = argparse.ArgumentParser(description="Benchmark the /move hot paths against a stored baseline.")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before a case is flagged")
+    parser.add_argument("--recorded", help="also benchmark turns from a recording (see recorder.py)")
+    parser.add_argument("--only", nargs="+", help="case names to run, e.g. move a_star_search")
+    args = parser.parse_args()
+
+    boards = dict(BOARDS)
+    if args.recorded:
+        boards.update(recorded_boards(args.recorded))
+    results = run_suite(boards, args.only)
+
+    if args.save:
+        report(results)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        report(results)
+        print(f"\nNo baseline at {args.baseline}; run with --save to store one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s)")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    run()
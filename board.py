@@ -0,0 +1,105 @@
+# Compact, array-backed board representation.
+#
+# A board is a flat bytearray of OccupiedType codes indexed by y * width + x,
+# plus shared per-size tables: neighbour indices per cell (walls already excluded,
+# or wrapped around for wrapped games) and Manhattan distances. Search code
+# works on plain ints instead of allocating a Coord/Cell object per cell.
+
+import functools
+import typing
+from array import array
+
+class OccupiedType:
+    EMPTY = 0
+    FOOD = 1
+    SNAKE_BODY = 2
+    SNAKE_HEAD = 3
+
+# Move names and (dx, dy) deltas; move codes used by the search are indices into these
+MOVES = ("up", "down", "right", "left")
+DELTAS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# Cell reached from (x, y) by (dx, dy): off the board is -1, unless the board wraps
+# around (the "wrapped" ruleset), in which case leaving one edge enters the opposite one
+def _step(width: int, height: int, x: int, y: int, dx: int, dy: int, wrapped: bool) -> int:
+    nx = x + dx
+    ny = y + dy
+    if wrapped:
+        return (ny % height) * width + nx % width
+    if 0 <= nx < width and 0 <= ny < height:
+        return ny * width + nx
+    return -1
+
+# Per-cell tuple of neighbour indices (walls already excluded), in up/down/right/left order
+def neighbour_table(width: int, height: int, wrapped: bool = False) -> typing.Tuple[typing.Tuple[int, ...], ...]:
+    return tuple(
+        tuple(cell for cell in steps if cell != -1)
+        for steps in step_table(width, height, wrapped)
+    )
+
+# Per-cell 4-tuple of the index reached by each move in MOVES order, -1 when off the board
+def step_table(width: int, height: int, wrapped: bool = False) -> typing.Tuple[typing.Tuple[int, int, int, int], ...]:
+    return tuple(
+        tuple(_step(width, height, idx % width, idx // width, dx, dy, wrapped) for dx, dy in DELTAS)
+        for idx in range(width * height)
+    )
+
+# manhattan_table(w, h)[a][b] is the number of moves between cells a and b on an
+# empty board (going around the edges when wrapped). One row per cell, so a search
+# towards a fixed goal fetches the goal's row once and indexes it per expansion.
+def manhattan_table(width: int, height: int, wrapped: bool = False) -> typing.Tuple[typing.Sequence[int], ...]:
+    def axis(a: int, b: int, size: int) -> int:
+        d = abs(a - b)
+        return min(d, size - d) if wrapped else d
+
+    rows = []
+    for a in range(width * height):
+        ax, ay = a % width, a // width
+        row = [axis(ax, b % width, width) + axis(ay, b // width, height) for b in range(width * height)]
+        rows.append(bytes(row) if width + height < 256 else array("H", row))
+    return tuple(rows)
+
+# Tables only depend on the board size (and wrapping), so every board of that size
+# shares one; they are built on first use and never modified
+neighbours_for = functools.lru_cache(maxsize=None)(neighbour_table)
+steps_for = functools.lru_cache(maxsize=None)(step_table)
+manhattan_for = functools.lru_cache(maxsize=None)(manhattan_table)
+
+STANDARD_SIZES = ((7, 7), (11, 11), (19, 19))
+
+# Build the tables for the usual board sizes ahead of the first game; in a pre-fork
+# server call this in the parent so every worker inherits them
+def warm(sizes: typing.Iterable[typing.Tuple[int, int]] = STANDARD_SIZES):
+    for width, height in sizes:
+        for wrapped in (False, True):
+            neighbours_for(width, height, wrapped)
+            steps_for(width, height, wrapped)
+            manhattan_for(width, height, wrapped)
+
+class Board:
+    __slots__ = ("width", "height", "wrapped", "cells", "neighbours")
+
+    def __init__(self, width: int, height: int, wrapped: bool = False):
+        self.width = width
+        self.height = height
+        self.wrapped = wrapped
+        self.cells = bytearray(width * height)  # all OccupiedType.EMPTY
+        self.neighbours = neighbours_for(width, height, wrapped)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def xy(self, idx: int) -> typing.Tuple[int, int]:
+        return idx % self.width, idx // self.width
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    # Swap the cells for an immutable copy, so a board shared by several readers
+    # (see main.BoardContext) can't be changed under them; writes raise TypeError
+    def freeze(self) -> "Board":
+        self.cells = bytes(self.cells)
+        return self
+
+    def is_blocked(self, idx: int) -> bool:
+        return self.cells[idx] >= OccupiedType.SNAKE_BODY
@@ -0,0 +1,229 @@
+# Opening book and small-endgame table.
+#
+# The first turns of a game start from a handful of spawn layouts, and 1v1
+# endgames of short snakes on small boards keep coming back, so their best moves
+# are worked out offline - positions come from games played by simulator.py and
+# each one gets a long minimax search - and stored in a compact binary file:
+#
+#   header   "BSBK", version, entry count, opening turns, endgame cells and length
+#   keys     sorted uint64 position keys (native byte order)
+#   moves    one uint8 move code (board.MOVES) per key
+#
+# The server memory-maps the file at import, so with a pre-fork server every
+# worker shares the same pages, and a lookup is a binary search over the mapped
+# keys. Keys are canonical over the board's symmetries (mirrors, and rotations
+# on square boards): a position and its mirror image share one entry and the
+# stored move is mapped back to the board as it was sent. Every entry is solved
+# under the standard rules, so other rulesets never consult the book.
+#
+# Generate a book with:
+#   python book.py --opening-games 40 --endgame-games 40 --budget-ms 1000
+
+import argparse
+import bisect
+import functools
+import hashlib
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+import typing
+from array import array
+
+from board import DELTAS, MOVES
+import gamestate
+
+BOOK_FILE = os.environ.get("BOOK_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "book.bin"))
+MAGIC = b"BSBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIHBB")  # magic, version, reserved, count, opening turns, endgame cells, endgame length
+HEALTH_BUCKET = 10
+
+OPENING_TURNS = 6
+ENDGAME_CELLS = 49  # boards up to 7x7
+ENDGAME_LENGTH = 6
+# Searches that didn't get this deep (and found no forced result) aren't stored,
+# indexed by snake count (more snakes use the last). A ply moves every snake at
+# once, so the tree widens fast: in the default second a 1v1 endgame reaches 8-10
+# plies and a four-snake opening 3-4
+MIN_DEPTH = (6, 6, 6, 4, 3)
+
+# The eight symmetries of a square board as functions of (x, y, n); non-square
+# boards only have the first four
+TRANSFORMS = (
+    lambda x, y, w, h: (x, y),
+    lambda x, y, w, h: (w - 1 - x, y),
+    lambda x, y, w, h: (x, h - 1 - y),
+    lambda x, y, w, h: (w - 1 - x, h - 1 - y),
+    lambda x, y, w, h: (y, x),
+    lambda x, y, w, h: (h - 1 - y, x),
+    lambda x, y, w, h: (y, w - 1 - x),
+    lambda x, y, w, h: (h - 1 - y, w - 1 - x),
+)
+
+# Per symmetry: the cell permutation and the move-code permutation
+@functools.lru_cache(maxsize=None)
+def symmetries(width: int, height: int) -> typing.Tuple[typing.Tuple[typing.Tuple[int, ...], typing.Tuple[int, ...]], ...]:
+    result = []
+    for t in TRANSFORMS[:8 if width == height else 4]:
+        cells = []
+        for idx in range(width * height):
+            x, y = t(idx % width, idx // width, width, height)
+            cells.append(y * width + x)
+        moves = []
+        for dx, dy in DELTAS:
+            # Where the move's step lands, seen from the transformed origin
+            ox, oy = t(0, 0, width, height)
+            sx, sy = t(dx, dy, width, height)
+            moves.append(DELTAS.index((sx - ox, sy - oy)))
+        result.append((tuple(cells), tuple(moves)))
+    return tuple(result)
+
+def _key(state: gamestate.GameState, cells: typing.Sequence[int]) -> int:
+    you = state.you
+    opponents = sorted(
+        tuple([s.health // HEALTH_BUCKET, s.length] + [cells[c] for c in s.body])
+        for s in state.snakes if s.id != you.id
+    )
+    values = [state.width, state.height, you.health // HEALTH_BUCKET, you.length]
+    values += [cells[c] for c in you.body]
+    values.append(len(opponents))
+    for opponent in opponents:
+        values += opponent
+    food = sorted(cells[c] for c in state.food)
+    values.append(len(food))
+    values += food
+    values += sorted(cells[c] for c in state.hazards)
+    digest = hashlib.blake2b(array("H", values).tobytes(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+# Canonical key of a position and the move-code permutation into that frame
+def canonical(state: gamestate.GameState) -> typing.Tuple[int, typing.Tuple[int, ...]]:
+    return min((_key(state, cells), moves) for cells, moves in symmetries(state.width, state.height))
+
+def is_endgame(state: gamestate.GameState, cells: int = ENDGAME_CELLS, length: int = ENDGAME_LENGTH) -> bool:
+    return (len(state.snakes) == 2 and state.width * state.height <= cells
+            and all(s.length <= length for s in state.snakes))
+
+class Book:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, self.opening_turns, self.endgame_cells, self.endgame_length = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} book")
+        view = memoryview(self._map)
+        self.keys = view[HEADER.size:HEADER.size + 8 * count].cast("Q")
+        self.moves = view[HEADER.size + 8 * count:HEADER.size + 9 * count]
+        self.path = path
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # Whether a position could be in the book at all; cheap, so misses cost little
+    def covers(self, state: gamestate.GameState) -> bool:
+        if state.ruleset != "standard":
+            return False
+        return state.turn <= self.opening_turns or is_endgame(state, self.endgame_cells, self.endgame_length)
+
+    def lookup(self, game_state: typing.Dict) -> typing.Optional[str]:
+        state = gamestate.compact(game_state)
+        if not self.covers(state):
+            return None
+        key, moves = canonical(state)
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return None
+        return MOVES[moves.index(self.moves[i])]
+
+def write_book(path: str, entries: typing.Dict[int, int], opening_turns: int = OPENING_TURNS,
+               endgame_cells: int = ENDGAME_CELLS, endgame_length: int = ENDGAME_LENGTH):
+    keys = sorted(entries)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), opening_turns, endgame_cells, endgame_length))
+        f.write(array("Q", keys).tobytes())
+        f.write(bytes(entries[k] for k in keys))
+    os.replace(path + ".tmp", path)
+
+def load(path: str = BOOK_FILE) -> typing.Optional[Book]:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return Book(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring opening book {path}: {e}", file=sys.stderr)
+        return None
+
+BOOK = load()
+
+# -------------------------
+# Offline generation
+# -------------------------
+
+def collect(config, games: int, seed: int, wanted: typing.Callable[[gamestate.GameState], bool]) -> typing.Dict[int, typing.Dict]:
+    import simulator
+
+    positions: typing.Dict[int, typing.Dict] = {}
+
+    def observe(game_state: typing.Dict):
+        state = gamestate.from_dict(game_state)
+        if wanted(state):
+            positions.setdefault(canonical(state)[0], game_state)
+
+    for i in range(games):
+        simulator.play_game(config, seed + i, observe)
+    return positions
+
+# Best move for one position, in the canonical frame; None when the search was too shallow
+def solve(args: typing.Tuple[typing.Dict, float]) -> typing.Optional[typing.Tuple[int, int]]:
+    import search
+    from transposition import TranspositionTable
+
+    game_state, budget_ms = args
+    state = gamestate.from_dict(game_state)
+    result = search.iterative_deepening(game_state, budget_ms=budget_ms, table=TranspositionTable())
+    min_depth = MIN_DEPTH[min(len(state.snakes), len(MIN_DEPTH) - 1)]
+    if result.depth < min_depth and search.LOSS < result.score < search.WIN:
+        return None
+    key, moves = canonical(state)
+    return key, moves[MOVES.index(result.move)]
+
+def main():
+    import simulator
+
+    parser = argparse.ArgumentParser(description="Precompute the opening book and small-endgame table.")
+    parser.add_argument("--out", default=BOOK_FILE)
+    parser.add_argument("--opening-games", type=int, default=40, help="11x11 four-snake games to take openings from")
+    parser.add_argument("--endgame-games", type=int, default=40, help="7x7 1v1 games to take endgames from")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="search time per position")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    openings = simulator.GameConfig(("main", "hungry", "dodge", "main"), "standard", 11, 11, max_turns=OPENING_TURNS + 1)
+    positions = collect(openings, args.opening_games, args.seed, lambda s: s.turn <= OPENING_TURNS)
+    print(f"{len(positions)} opening positions")
+    opening_keys = set(positions)
+    endgames = simulator.GameConfig(("main", "dodge"), "standard", 7, 7)
+    found = collect(endgames, args.endgame_games, args.seed, is_endgame)
+    print(f"{len(found)} endgame positions")
+    positions.update(found)
+
+    jobs = [(game_state, args.budget_ms) for game_state in positions.values()]
+    with multiprocessing.Pool(args.workers or multiprocessing.cpu_count()) as workers:
+        solved = [r for r in workers.imap_unordered(solve, jobs, chunksize=4) if r is not None]
+
+    write_book(args.out, dict(solved))
+    solved_openings = sum(1 for key, _ in solved if key in opening_keys)
+    print(f"{len(solved)} of {len(jobs)} positions ({solved_openings} of {len(opening_keys)} openings) "
+          f"written to {args.out} in {time.perf_counter() - started:.0f}s")
+    if opening_keys and not solved_openings:
+        print("No opening reached its minimum depth; raise --budget-ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Deadline layer around a move handler.
+#
+# The engine waits game.timeout milliseconds for our answer and repeats our last
+# move when we are late. This layer works out a safe fallback move first, runs the
+# real handler in a worker thread with the rest of the budget (minus a margin for
+# the network, but never more than half of a short timeout), and answers with the fallback if the handler hasn't finished in
+# time or fails. Each turn's budget use is logged.
+#
+# Searches can ask how much time is left with remaining_ms() and size themselves
+# to fit.
+
+import concurrent.futures
+import contextvars
+import logging
+import os
+import time
+import typing
+
+import metrics
+from position import Position
+
+NETWORK_MARGIN_MS = float(os.environ.get("MOVE_NETWORK_MARGIN_MS", "100"))
+HANDLER_THREADS = int(os.environ.get("MOVE_HANDLER_THREADS", "32"))
+
+logger = logging.getLogger("battlesnake.deadline")
+
+_deadline: contextvars.ContextVar[typing.Optional[float]] = contextvars.ContextVar("move_deadline", default=None)
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=HANDLER_THREADS, thread_name_prefix="move")
+
+# Milliseconds left before we must answer, or None outside a deadline-guarded move
+def remaining_ms() -> typing.Optional[float]:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max((deadline - time.perf_counter()) * 1000.0, 0.0)
+
+# Cheap safe move: on the board and not into a body that will still be there
+def fallback_move(game_state: typing.Dict) -> str:
+    pos = Position.from_game_state(game_state)
+    return pos.move_name(pos.safe_moves(0)[0])
+
+def with_deadline(move_handler: typing.Callable[[typing.Dict], typing.Dict]) -> typing.Callable[[typing.Dict], typing.Dict]:
+    def guarded_move(game_state: typing.Dict) -> typing.Dict:
+        start = time.perf_counter()
+        timeout_ms = game_state.get('game', {}).get('timeout', 500)
+        # At or below the margin the handler would get nothing and every move would be
+        # the fallback; keep at least half the timeout for it
+        budget_ms = max(timeout_ms * 0.5, timeout_ms - NETWORK_MARGIN_MS)
+        deadline = start + budget_ms / 1000.0
+        fallback = {"move": fallback_move(game_state)}
+
+        # The handler runs with the deadline in its context so remaining_ms() works there,
+        # and with its own phase-time dict, kept only if it answers in time
+        context = contextvars.copy_context()
+        context.run(_deadline.set, deadline)
+        handler_timings = context.run(metrics.begin)
+        future = _executor.submit(context.run, move_handler, game_state)
+
+        outcome = "ok"
+        try:
+            response = future.result(timeout=max(deadline - time.perf_counter(), 0.0))
+            metrics.merge(handler_timings)
+        except concurrent.futures.TimeoutError:
+            outcome = "late, sent fallback"
+            response = fallback
+            metrics.count("moves_late")
+        except Exception:
+            logger.exception("move handler failed on turn %s", game_state.get('turn'))
+            outcome = "failed, sent fallback"
+            response = fallback
+            metrics.count("moves_failed")
+
+        used_ms = (time.perf_counter() - start) * 1000.0
+        logger.info(
+            "turn %s: %s in %.1f of %.0f ms (%.0f%% of budget, %s)",
+            game_state.get('turn'), response.get('move'), used_ms, budget_ms,
+            100.0 * used_ms / budget_ms if budget_ms else 100.0, outcome,
+        )
+        return response
+
+    return guarded_move
@@ -0,0 +1,120 @@
+# Batched position evaluation.
+#
+# The evaluation helpers elsewhere score one position per call. Here a batch of
+# positions of the same board size is stacked into arrays - free-cell masks,
+# head seeds per snake slot, food masks, lengths and health - and every feature
+# is computed for the whole batch at once with the NumPy kernels in analysis.py:
+# one multi-source BFS over (batch, snake, height, width) gives reachable area,
+# Voronoi territory, distance to food and the food race for every position.
+#
+# Features are from snake 0's point of view (`you` for payloads), and the score
+# is their weighted sum. Needs numpy; ENABLED is False without it.
+
+import typing
+
+import analysis
+from analysis import UNREACHED, np
+from position import Position
+
+ENABLED = analysis.ENABLED
+
+FEATURES = (
+    "area",  # free cells we can reach
+    "territory",  # cells we reach strictly before every opponent
+    "food_distance",  # steps to the closest reachable food (board size when none)
+    "food_won",  # food items we reach strictly first
+    "opponent_distance",  # Manhattan distance to the closest opponent head
+    "length_diff",  # our length minus the longest opponent's
+    "health",
+    "opponents",  # opponents still alive
+)
+
+WEIGHTS = (1.0, 2.0, -1.0, 5.0, 0.5, 10.0, 0.2, -50.0)
+
+class Batch(typing.NamedTuple):
+    width: int
+    height: int
+    free: "np.ndarray"  # (b, h, w) bool, cells no snake occupies
+    seeds: "np.ndarray"  # (b, n, h, w) bool, each snake slot's head; slot 0 is us
+    alive: "np.ndarray"  # (b, n) bool
+    lengths: "np.ndarray"  # (b, n)
+    health: "np.ndarray"  # (b,)
+    food: "np.ndarray"  # (b, h, w) bool
+
+def _position(state: typing.Union[typing.Dict, Position]) -> Position:
+    return state if isinstance(state, Position) else Position.from_game_state(state)
+
+# Stack payloads or Positions (all the same board size) into one Batch
+def stack(states: typing.Sequence[typing.Union[typing.Dict, Position]]) -> Batch:
+    positions = [_position(s) for s in states]
+    width, height = positions[0].width, positions[0].height
+    if any(p.width != width or p.height != height for p in positions):
+        raise ValueError("every position in a batch must have the same board size")
+    b, n, cells = len(positions), max(len(p.bodies) for p in positions), width * height
+
+    occupied = np.frombuffer(b"".join(bytes(p.occupied) for p in positions), dtype=np.uint8)
+    food = np.frombuffer(b"".join(bytes(p.food) for p in positions), dtype=np.uint8)
+    seeds = np.zeros((b, n, cells), dtype=bool)
+    alive = np.zeros((b, n), dtype=bool)
+    lengths = np.zeros((b, n), dtype=np.int16)
+    health = np.zeros(b, dtype=np.int16)
+    for i, p in enumerate(positions):
+        health[i] = p.health[0]
+        for s, body in enumerate(p.bodies):
+            if p.alive[s]:
+                seeds[i, s, body[0]] = True
+                alive[i, s] = True
+                lengths[i, s] = len(body)
+    return Batch(
+        width, height,
+        free=(occupied == 0).reshape(b, height, width),
+        seeds=seeds.reshape(b, n, height, width),
+        alive=alive,
+        lengths=lengths,
+        health=health,
+        food=(food != 0).reshape(b, height, width),
+    )
+
+# (b, len(FEATURES)) feature matrix
+def features(batch: Batch) -> "np.ndarray":
+    b, n = batch.alive.shape
+    height, width = batch.height, batch.width
+    dist = analysis.distances(batch.free[:, None], batch.seeds)
+    ours = dist[:, 0]
+    theirs = dist[:, 1:].min(axis=1) if n > 1 else np.full_like(ours, UNREACHED)
+
+    area = ((ours > 0) & (ours < UNREACHED)).sum(axis=(1, 2))
+    territory = analysis.voronoi(dist)[:, 0]
+    food_dist = np.where(batch.food, ours, UNREACHED).min(axis=(1, 2))
+    food_dist = np.where(food_dist < UNREACHED, food_dist, width * height)
+    food_won = (batch.food & (ours < theirs)).sum(axis=(1, 2))
+
+    # Head coordinates per slot from the seed masks
+    flat = batch.seeds.reshape(b, n, -1).argmax(axis=2)
+    hx, hy = flat % width, flat // width
+    manhattan = np.abs(hx[:, 1:] - hx[:, :1]) + np.abs(hy[:, 1:] - hy[:, :1])
+    opponents = batch.alive[:, 1:]
+    opponent_dist = np.where(opponents, manhattan, width + height).min(axis=1) if n > 1 else np.full(b, width + height)
+    longest = np.where(opponents, batch.lengths[:, 1:], 0).max(axis=1) if n > 1 else np.zeros(b)
+
+    out = np.empty((b, len(FEATURES)), dtype=np.float64)
+    out[:, 0] = area
+    out[:, 1] = territory
+    out[:, 2] = food_dist
+    out[:, 3] = food_won
+    out[:, 4] = opponent_dist
+    out[:, 5] = batch.lengths[:, 0] - longest
+    out[:, 6] = batch.health
+    out[:, 7] = opponents.sum(axis=1)
+    # A position we are already out of is worth nothing, whatever the features say
+    out[~batch.alive[:, 0]] = 0.0
+    return out
+
+def scores(feature_matrix: "np.ndarray", weights: typing.Sequence[float] = WEIGHTS) -> "np.ndarray":
+    return feature_matrix @ np.asarray(weights, dtype=np.float64)
+
+# Features and scores for a batch of payloads or Positions in one pass
+def evaluate(states: typing.Sequence[typing.Union[typing.Dict, Position]],
+             weights: typing.Sequence[float] = WEIGHTS) -> typing.Tuple["np.ndarray", "np.ndarray"]:
+    matrix = features(stack(states))
+    return matrix, scores(matrix, weights)
@@ -25,6 +25,13 @@ DIRECTIONS: typing.Dict[str, typing.Tuple[int, int]] = {
     "right": (1, 0),
 }
 
+# Move score weights (see move); tune.py can search for better ones
+WEIGHTS: typing.Dict[str, float] = {
+    "head_dist": 1.0,
+    "body_dist": 0.4,
+    "space": 0.15,
+}
+
 # -------------------------
 # Helpers
 # -------------------------
@@ -168,9 +175,9 @@ def move(game_state: GameState) -> typing.Dict:
         return {"move": mv}
 
     # 4) Score moves:
-    #    - Maximize distance to nearest opponent head (weight 1.0)
-    #    - Maximize distance to nearest opponent body segment (weight 0.4)
-    #    - Prefer larger reachable space via flood fill (weight 0.15)
+    #    - Maximize distance to nearest opponent head (weight head_dist, 1.0)
+    #    - Maximize distance to nearest opponent body segment (weight body_dist, 0.4)
+    #    - Prefer larger reachable space via flood fill (weight space, 0.15)
     #    - Slight random jitter to break ties
     opp_body_coords = []
     for s in board["snakes"]:
@@ -189,9 +196,9 @@ def move(game_state: GameState) -> typing.Dict:
         space = flood_fill_size(nxt, sim_blocked, width, height, limit=200)
 
         score = (
-            head_dist * 1.0 +
-            body_dist * 0.4 +
-            space * 0.15 +
+            head_dist * WEIGHTS["head_dist"] +
+            body_dist * WEIGHTS["body_dist"] +
+            space * WEIGHTS["space"] +
             random.random() * 0.01
         )
         scored.append((score, mv))
@@ -0,0 +1,103 @@
+# Fast decode path for the /move payload.
+#
+# loads/dumps use orjson when it is installed (pip install orjson) and the stdlib
+# json module otherwise. compact() walks a decoded payload once and keeps only what
+# the board builders need, with every coordinate packed into a board index
+# (y * width + x), so getBoardCoords, getBoardContext and Position.from_game_state
+# read tuples of ints instead of walking the nested {'x', 'y'} dicts themselves.
+#
+# The server binds each /move payload's compact form for the length of that
+# request (bind/unbind), so the deadline fallback, the board context and the
+# search share one decode. Outside a request every compact() call decodes afresh,
+# so payloads changed in place are never answered from a stale copy.
+
+import contextvars
+import json
+import typing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+DEFAULT_HAZARD_DAMAGE = 14
+
+def loads(data: typing.Union[bytes, str]) -> typing.Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: typing.Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+class Snake(typing.NamedTuple):
+    id: str
+    health: int
+    length: int
+    head: int
+    body: typing.Tuple[int, ...]  # head first
+
+class GameState(typing.NamedTuple):
+    width: int
+    height: int
+    turn: int
+    you: Snake
+    snakes: typing.Tuple[Snake, ...]  # in payload order, `you` included
+    food: typing.Tuple[int, ...]
+    hazards: typing.Tuple[int, ...]  # a cell appears once per stacked hazard
+    hazard_damage: int
+    wrapped: bool  # the "wrapped" ruleset: moving off one edge enters the opposite one
+    ruleset: str  # the ruleset's name, "standard" when the payload has none
+
+def _snake(snake: typing.Dict, width: int) -> Snake:
+    body = tuple([seg['y'] * width + seg['x'] for seg in snake['body']])
+    return Snake(snake['id'], snake['health'], len(body), body[0], body)
+
+def from_dict(game_state: typing.Dict) -> GameState:
+    board = game_state['board']
+    width = board['width']
+    snakes = tuple([_snake(s, width) for s in board['snakes']])
+    you_id = game_state['you']['id']
+    you = next((s for s in snakes if s.id == you_id), None)
+    if you is None:
+        you = _snake(game_state['you'], width)
+    ruleset = game_state.get('game', {}).get('ruleset', {})
+    settings = ruleset.get('settings', {})
+    return GameState(
+        width=width,
+        height=board['height'],
+        turn=game_state.get('turn', 0),
+        you=you,
+        snakes=snakes,
+        food=tuple([f['y'] * width + f['x'] for f in board['food']]),
+        hazards=tuple([h['y'] * width + h['x'] for h in board.get('hazards', ())]),
+        hazard_damage=settings.get('hazardDamagePerTurn', DEFAULT_HAZARD_DAMAGE),
+        wrapped=ruleset.get('name') == "wrapped",
+        ruleset=ruleset.get('name', "standard"),
+    )
+
+# (payload, compacted) for the request being handled
+_bound: contextvars.ContextVar[typing.Optional[typing.Tuple[typing.Dict, GameState]]] = \
+    contextvars.ContextVar("compacted", default=None)
+
+# Decode the request's payload once and share it with everything the request calls
+# (threads started from a copy of this context included); undo with unbind()
+def bind(game_state: typing.Dict) -> GameState:
+    state = from_dict(game_state)
+    _bound.set((game_state, state))
+    return state
+
+def unbind():
+    _bound.set(None)
+
+# Compact form of a decoded payload: the bound one for the request's own payload,
+# a fresh decode otherwise
+def compact(game_state: typing.Union[typing.Dict, GameState]) -> GameState:
+    if isinstance(game_state, GameState):
+        return game_state
+    bound = _bound.get()
+    if bound is not None and bound[0] is game_state:
+        return bound[1]
+    return from_dict(game_state)
@@ -0,0 +1,24 @@
+# Serve several snakes from one server process.
+#
+# Each snake is mounted under its own path - http://localhost:8000/hungry,
+# http://localhost:8000/dodge, ... - and GET / lists them, so a scrimmage needs
+# one process (one search pool, one set of lookup tables, one /metrics) instead
+# of one per snake. Snakes are the short names from simulator.SNAKES or any
+# importable module with info/start/move/end.
+#
+# Usage:
+#   python lineup.py                       # main, hungry, dodge and circle
+#   PORT=5001 python lineup.py circle hungry dodge
+
+import sys
+import typing
+
+from simulator import SNAKES, handlers_for
+
+# {name: handler set} for run_server; names are the last part of the module path
+def registry(snakes: typing.Sequence[str]) -> typing.Dict[str, typing.Dict[str, typing.Callable]]:
+    return {snake.rsplit(".", 1)[-1]: handlers_for(snake) for snake in snakes}
+
+if __name__ == "__main__":
+    from server import run_server
+    run_server(registry(sys.argv[1:] or list(SNAKES)))
@@ -10,88 +10,93 @@
 # To get you started we've included code to prevent your Battlesnake from moving backwards.
 # For more info see docs.battlesnake.com
 
+import os
 import random
 import typing
 import heapq
+from array import array
 from collections import deque
 from enum import Enum
 #from collections import deque
 
-MAX_ROW = 15
-MAX_COL = 15
-
-class OccupiedType:
-    EMPTY = 0
-    FOOD = 1
-    SNAKE_BODY = 2
-    SNAKE_HEAD = 3
+from board import MOVES, Board, OccupiedType, manhattan_for, steps_for
+import analysis
+import book
+import gamestate
+import mcts
+import metrics
+import ponder
+import pool
+import search
+import sessions
+
+# Which move policy `move` uses: "heuristic" (food race + random safe move),
+# "minimax" (time-budgeted game-tree search, see search.py) or "mcts" (see mcts.py)
+MOVE_POLICY = os.environ.get("MOVE_POLICY", "heuristic")
+
+# Food race tie rules for the heuristic: an opponent takes a food item from us when
+# it is more than this many steps closer to it than we are. The defaults give it
+# ties against us when it is at least as long, and nothing else; tune.py can
+# search for better values.
+FOOD_RACE: typing.Dict[str, float] = {
+    "vs_longer": -0.5,  # opponents at least as long as us
+    "vs_shorter": 0.5,  # shorter opponents
+}
+
+# With nothing to eat, the heuristic weighs Voronoi territory (see analysis.py) only
+# when an opponent head is within this many steps of ours; further apart, one move
+# barely shifts who reaches what first, and the pass costs about a millisecond
+CONTEST_DISTANCE = 4
 
 class Coord:
     def __init__(self):
         self.x = 0
         self.y = 0
         self.occupiedType = OccupiedType.EMPTY # 0 = empty, 1 = food, 2 = snake body, 3 = snake head
-        
-class Cell:
-    def __init__(self):
-        self.parent_i = 0  # Parent cell's row index
-        self.parent_j = 0  # Parent cell's column index
-        self.f = float('inf')  # Total cost of the cell (g + h)
-        self.g = float('inf')  # Cost from start to this cell
-        self.h = 0  # Heuristic cost from this cell to destination
 
 # Helper functions
 
 def manhattan(a: Coord, b: Coord) -> int:
     return abs(a.x - b.x) + abs(a.y - b.y)
 
-def is_valid(row, col):
-    return (row >= 0) and (row < MAX_ROW) and (col >= 0) and (col < MAX_COL)
+def is_valid(board: Board, row, col):
+    return board.in_bounds(row, col)
 
 # Check if a cell is unblocked
-def is_unblocked(grid: list[Coord], row, col):
-    return grid[row][col].occupiedType != 2 and grid[row][col].occupiedType != 3
+def is_unblocked(board: Board, row, col):
+    return not board.is_blocked(board.index(row, col))
 
 # Check if a cell is the destination
 def is_destination(row, col, dest: Coord):
     return row == dest.x and col == dest.y
 
-# Calculate the heuristic value of a cell (Euclidean distance to destination)
-def calculate_h_value(row, col, dest: Coord):
-    return ((row - dest.x) ** 2 + (col - dest.y) ** 2) ** 0.5
-
-# IMPROVE THIS
-def trace_path(cell_details, dest: Coord):
+# Follow parent indices back from dest; returns the path from source (exclusive) to dest
+def trace_path(board: Board, parent, dest: int) -> typing.List[Coord]:
     path = []
-    row = dest.x
-    col = dest.y
+    idx = dest
 
-    # Trace the path from destination to source using parent cells
-    while not (cell_details[row][col].parent_i == row and cell_details[row][col].parent_j == col):
+    # The source is the only cell that is its own parent
+    while parent[idx] != idx:
         nextS = Coord()
-        nextS.x = row
-        nextS.y = col
+        nextS.x, nextS.y = board.xy(idx)
         path.append(nextS)
-        temp_row = cell_details[row][col].parent_i
-        temp_col = cell_details[row][col].parent_j
-        row = temp_row
-        col = temp_col
+        idx = parent[idx]
 
     # Reverse the path to get the path from source to destination
     path.reverse()
-    # for i in path:
-        # print(i.x, ",", i.y, "->", end=" ")
     return path
 
 # Implement the A* search algorithm
-def a_star_search(grid, src: Coord, dest: Coord):
+# All bookkeeping is flat arrays indexed like board.cells, so a search allocates a
+# handful of buffers instead of a Cell object per board cell.
+def a_star_search(board: Board, src: Coord, dest: Coord):
     # Check if the source and destination are valid
-    if not is_valid(src.x, src.y) or not is_valid(dest.x, dest.y):
+    if not is_valid(board, src.x, src.y) or not is_valid(board, dest.x, dest.y):
         # print("Source or destination is invalid")
         return None
 
     # Check if the source and destination are unblocked
-    if not is_unblocked(grid, src.x, src.y) or not is_unblocked(grid, dest.x, dest.y):
+    if not is_unblocked(board, src.x, src.y) or not is_unblocked(board, dest.x, dest.y):
         # print("Source or the destination is blocked")
         return None
 
@@ -100,77 +105,85 @@ def a_star_search(grid, src: Coord, dest: Coord):
         # print("We are already at the destination")
         return None
 
-    # Initialize the closed list (visited cells)
-    closed_list = [[False for _ in range(MAX_COL)] for _ in range(MAX_ROW)]
-    # Initialize the details of each cell
-    cell_details = [[Cell() for _ in range(MAX_COL)] for _ in range(MAX_ROW)]
-
-    # Initialize the start cell details
-    i = src.x
-    j = src.y
-    cell_details[i][j].f = 0
-    cell_details[i][j].g = 0
-    cell_details[i][j].h = 0
-    cell_details[i][j].parent_i = i
-    cell_details[i][j].parent_j = j
-
-    # Initialize the open list (cells to be visited) with the start cell
-    open_list = []
-    heapq.heappush(open_list, (0.0, i, j))
-
-    # Initialize the flag for whether destination is found
-    found_dest = False
-
-    # Main loop of A* search algorithm
-    while len(open_list) > 0:
+    cells = board.cells
+    neighbours = board.neighbours
+    start = board.index(src.x, src.y)
+    goal = board.index(dest.x, dest.y)
+    # Heuristic: Manhattan distance to the goal, looked up in the shared per-size table
+    h_value = manhattan_for(board.width, board.height, board.wrapped)[goal]
+
+    closed_list = bytearray(len(cells))  # visited cells
+    g = array('i', [-1]) * len(cells)  # cost from start, -1 = not reached yet
+    parent = array('i', [-1]) * len(cells)
+    g[start] = 0
+    parent[start] = start
+
+    # Open list of (f, index), starting with the source
+    open_list = [(0, start)]
+
+    while open_list:
         # Pop the cell with the smallest f value from the open list
-        p = heapq.heappop(open_list)
-
-        # Mark the cell as visited
-        i = p[1]
-        j = p[2]
-        closed_list[i][j] = True
-
-        # For each direction, check the successors
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        for dir in directions:
-            new_i = i + dir[0]
-            new_j = j + dir[1]
-
-            # If the successor is valid, unblocked, and not visited
-            if is_valid(new_i, new_j) and is_unblocked(grid, new_i, new_j) and not closed_list[new_i][new_j]:
-                # If the successor is the destination
-                if is_destination(new_i, new_j, dest):
-                    # Set the parent of the destination cell
-                    cell_details[new_i][new_j].parent_i = i
-                    cell_details[new_i][new_j].parent_j = j
-                    # Trace and print the path from source to destination
-                    path = trace_path(cell_details, dest)
-                    found_dest = True
-                    if len(path) >= 1:
-                        return path[0]
-                    return None
-                else:
-                    # Calculate the new f, g, and h values
-                    g_new = cell_details[i][j].g + 1.0
-                    h_new = calculate_h_value(new_i, new_j, dest)
-                    f_new = g_new + h_new
-
-                    # If the cell is not in the open list or the new f value is smaller
-                    if cell_details[new_i][new_j].f == float('inf') or cell_details[new_i][new_j].f > f_new:
-                        # Add the cell to the open list
-                        heapq.heappush(open_list, (f_new, new_i, new_j))
-                        # Update the cell details
-                        cell_details[new_i][new_j].f = f_new
-                        cell_details[new_i][new_j].g = g_new
-                        cell_details[new_i][new_j].h = h_new
-                        cell_details[new_i][new_j].parent_i = i
-                        cell_details[new_i][new_j].parent_j = j
-
-    # If the destination is not found after visiting all cells
-    if not found_dest:
-        # print("Failed to find the destination cell")
-        return None
+        _, cur = heapq.heappop(open_list)
+        if closed_list[cur]:
+            continue
+        closed_list[cur] = 1
+
+        g_new = g[cur] + 1
+        for nxt in neighbours[cur]:
+            if closed_list[nxt] or cells[nxt] >= OccupiedType.SNAKE_BODY:
+                continue
+            if nxt == goal:
+                parent[nxt] = cur
+                path = trace_path(board, parent, goal)
+                if len(path) >= 1:
+                    return path[0]
+                return None
+            if g[nxt] == -1 or g_new < g[nxt]:
+                g[nxt] = g_new
+                parent[nxt] = cur
+                heapq.heappush(open_list, (g_new + h_value[nxt], nxt))
+
+    # print("Failed to find the destination cell")
+    return None
+
+# Result of a breadth-first search from one source cell, indexed like board.cells:
+# dist is the number of steps to each cell (-1 when unreachable) and first_step is
+# the index of the source's neighbour that starts a shortest path to it.
+class DistanceField(typing.NamedTuple):
+    dist: array
+    first_step: array
+
+# Unit-cost BFS from src over the whole board in a single pass. The source itself may
+# be blocked (opponent heads are), but no other blocked cell is ever entered.
+def distance_field(board: Board, src: int) -> DistanceField:
+    cells = board.cells
+    neighbours = board.neighbours
+    dist = array('i', [-1]) * len(cells)
+    first_step = array('i', [-1]) * len(cells)
+    dist[src] = 0
+
+    queue = deque()
+    for nxt in neighbours[src]:
+        if cells[nxt] < OccupiedType.SNAKE_BODY:
+            dist[nxt] = 1
+            first_step[nxt] = nxt
+            queue.append(nxt)
+
+    while queue:
+        cur = queue.popleft()
+        d = dist[cur] + 1
+        step = first_step[cur]
+        for nxt in neighbours[cur]:
+            if dist[nxt] == -1 and cells[nxt] < OccupiedType.SNAKE_BODY:
+                dist[nxt] = d
+                first_step[nxt] = step
+                queue.append(nxt)
+
+    return DistanceField(dist, first_step)
+
+# Name of the move that takes a snake from cell `head` onto the adjacent cell `step`
+def direction_to(board: Board, head: int, step: int) -> str:
+    return MOVES[steps_for(board.width, board.height, board.wrapped)[head].index(step)]
 
 def getHazards(game_state: typing.Dict):
     return game_state['board']['hazards']
@@ -181,30 +194,42 @@ def getFood(game_state: typing.Dict):
 
 
 
-def getBoardCoords(game_state: typing.Dict):
-    board = []
-    # We've included code to prevent your Battlesnake from moving backwards
-    my_head = game_state["you"]["body"][0]
-    pointerSnakes = 0
-    pointerFood = 0
-
-    for i in range(MAX_ROW):
-        board.append([])
-        for j in range(MAX_COL):
-            tile = Coord()
-            tile.x = i
-            tile.y = j
-            tile.occupiedType = OccupiedType.EMPTY
-            board[i].append(tile)
-    for snake in getSnakes(game_state):
-        for segment in snake['body']:
-            if segment == my_head:
-                board[segment['x']][segment['y']].occupiedType = OccupiedType.EMPTY
-            else:
-                board[segment['x']][segment['y']].occupiedType = OccupiedType.SNAKE_BODY
-    for food in getFood(game_state):
-        board[food['x']][food['y']].occupiedType = OccupiedType.FOOD
+def getBoardCoords(game_state: typing.Dict) -> Board:
+    state = gamestate.compact(game_state)
+    board = Board(state.width, state.height, state.wrapped)
+    cells = board.cells
+    for snake in state.snakes:
+        for idx in snake.body:
+            cells[idx] = OccupiedType.SNAKE_BODY
+    # Our own head is left empty so searches can start from it
+    cells[state.you.head] = OccupiedType.EMPTY
+    for idx in state.food:
+        cells[idx] = OccupiedType.FOOD
     return board
+
+# Everything one /move needs to know about the board. Built once per turn from the
+# request JSON and handed read-only to every pathfinding and safety check that turn,
+# so the grid is never rebuilt per food item. Cells are board indices, and the
+# board's cells are frozen (bytes), so no helper can change them for the others.
+class BoardContext(typing.NamedTuple):
+    board: Board
+    head: int
+    you_id: str
+    you_length: int
+    food: typing.Tuple[int, ...]
+    opponents: typing.Tuple[typing.Tuple[int, int], ...]  # (head, length) per other snake
+
+def getBoardContext(game_state: typing.Dict) -> BoardContext:
+    state = gamestate.compact(game_state)
+    you = state.you
+    return BoardContext(
+        board=getBoardCoords(state).freeze(),
+        head=you.head,
+        you_id=you.id,
+        you_length=you.length,
+        food=state.food,
+        opponents=tuple((snake.head, snake.length) for snake in state.snakes if snake.id != you.id),
+    )
 #
     
 
@@ -225,11 +250,17 @@ def info() -> typing.Dict:
 
 # start is called when your Battlesnake begins a game
 def start(game_state: typing.Dict):
+    if MOVE_POLICY != "heuristic":
+        sessions.STORE.start(game_state)
     print("GAME START")
 
 
 # end is called when your Battlesnake finishes a game
 def end(game_state: typing.Dict):
+    session = sessions.STORE.get(sessions.session_key(game_state))
+    if session is not None:
+        ponder.stop(session.cache)
+        sessions.STORE.end(session.key)
     print("GAME OVER\n")
 
 
@@ -237,109 +268,146 @@ def end(game_state: typing.Dict):
 # Valid moves are "up", "down", "left", or "right"
 # See https://docs.battlesnake.com/api/example-move for available data
 def move(game_state: typing.Dict) -> typing.Dict:
+    # Known openings and small endgames were solved offline (see book.py)
+    if book.BOOK is not None:
+        known = book.BOOK.lookup(game_state)
+        if known is not None:
+            metrics.count("book_hits")
+            return {"move": known}
+    if MOVE_POLICY == "minimax":
+        # With a warm search pool (SEARCH_WORKERS > 0) every worker takes a share of our moves
+        result = None
+        if pool.active():
+            with metrics.phase("search"):
+                result = pool.parallel_minimax(game_state)
+        if result is None:
+            with metrics.phase("board"):
+                session = sessions.STORE.touch(game_state)
+                pos = session.position_copy()
+            with metrics.phase("search"):
+                result = search.iterative_deepening(game_state, table=session.table, pos=pos)
+        metrics.observe("search_nodes", result.nodes)
+        metrics.observe("search_depth", result.depth)
+        metrics.observe("search_cache_hits", result.cache_hits)
+        # print(f"MOVE {game_state['turn']}: {result.move} (depth {result.depth}, {result.nodes} nodes)")
+        return {"move": result.move}
+    if MOVE_POLICY == "mcts":
+        result = None
+        if pool.active():
+            with metrics.phase("search"):
+                result = pool.parallel_mcts(game_state)
+        if result is None:
+            # Keep last turn's tree (and whatever pondering added to it), re-rooted on this turn
+            with metrics.phase("board"):
+                session = sessions.STORE.touch(game_state)
+                ponder.stop(session.cache)
+                tree = session.cache.get("mcts_tree")
+                if tree is None:
+                    # Seeded from `random`, so a recorded turn's seed (see recorder.py) carries over
+                    tree = session.cache["mcts_tree"] = mcts.Tree(session.position_copy(), random.Random(random.getrandbits(64)))
+                else:
+                    tree.advance(session.position_copy())
+            with metrics.phase("search"):
+                result = mcts.run(game_state, tree=tree)
+            if ponder.ENABLED:
+                ponder.start(session.cache, tree)
+        metrics.observe("mcts_playouts", result.playouts)
+        # print(f"MOVE {game_state['turn']}: {result.move} ({result.playouts} playouts, {result.playouts_per_sec:.0f}/s)")
+        return {"move": result.move}
+    return heuristic_move(game_state)
+
+# Area and Voronoi territory for every move onto a free cell, in one batched pass
+def space_by_move(ctx: BoardContext) -> typing.Dict[str, analysis.MoveAnalysis]:
+    board = ctx.board
+    steps = steps_for(board.width, board.height, board.wrapped)[ctx.head]
+    moves = {MOVES[i]: cell for i, cell in enumerate(steps) if cell != -1 and not board.is_blocked(cell)}
+    return analysis.analyse_moves(board, ctx.head, moves, [head for head, _ in ctx.opponents])
+
+# Free cells reachable from `start` (not counted) once our head at `head` has become
+# body, counting no further than `limit`: enough to tell a pocket from open space
+# without a full flood fill
+def room(board: Board, head: int, start: int, limit: int) -> int:
+    cells = board.cells
+    neighbours = board.neighbours
+    seen = {head, start}
+    stack = [start]
+    count = 0
+    while stack and count < limit:
+        for nxt in neighbours[stack.pop()]:
+            if nxt not in seen and cells[nxt] < OccupiedType.SNAKE_BODY:
+                seen.add(nxt)
+                stack.append(nxt)
+                count += 1
+    return count
+
+# One-ply heuristic: chase the closest food we can win the race to, else the safe
+# move with the most room and territory
+def heuristic_move(game_state: typing.Dict) -> typing.Dict:
+
+    # One decode of the payload serves the safety checks and the food race below
+    with metrics.phase("board"):
+        ctx = getBoardContext(game_state)
+    board = ctx.board
+
+    # Steps 1 and 2: a move is unsafe if it leaves the board or runs into any
+    # snake's body (our own neck included)
+    steps = steps_for(board.width, board.height, board.wrapped)[ctx.head]
+    is_move_safe = {
+        MOVES[i]: cell != -1 and not board.is_blocked(cell)
+        for i, cell in enumerate(steps)
+    }
 
-    is_move_safe = {"up": True, "down": True, "left": True, "right": True}
-
-    # We've included code to prevent your Battlesnake from moving backwards
-    my_head = game_state["you"]["body"][0]  # Coordinates of your head
-    my_neck = game_state["you"]["body"][1]  # Coordinates of your "neck"
-
-    # TODO: Step 1 - Prevent your Battlesnake from moving out of bounds
-    board_width = game_state['board']['width']
-    board_height = game_state['board']['height']
-
-    if my_head["x"] <= 0:
-        is_move_safe["left"] = False
-
-    elif my_head["x"] >= board_width - 1:
-        is_move_safe["right"] = False
-
-    elif my_head["y"] >= board_height - 1:
-        is_move_safe["up"] = False
-
-    elif my_head["y"] <= 0:
-        is_move_safe["down"] = False
-
-    # TODO: Step 2 - Prevent your Battlesnake from colliding with itself
-    for snake in game_state['board']['snakes']:
-        snake_body = snake['body']
-        for segment in snake_body:
-            if (segment['x'] == my_head['x'] + 1) and (segment['y']
-                                                       == my_head['y']):
-                is_move_safe['right'] = False
-            if (segment['x'] == my_head['x'] - 1) and (segment['y']
-                                                       == my_head['y']):
-                is_move_safe['left'] = False
-            if (segment['x'] == my_head['x']) and (segment['y']
-                                                   == my_head['y'] + 1):
-                is_move_safe['up'] = False
-            if (segment['x'] == my_head['x']) and (segment['y']
-                                                   == my_head['y'] - 1):
-                is_move_safe['down'] = False
     current_food = None
     current_distance = 1000
-    next_step = None 
-    
-    sourcecoord = Coord()
-    sourcecoord.x = my_head['x']
-    sourcecoord.y = my_head['y']
-
-    for food in game_state['board']['food']:
-        foodcoord = Coord()
-        foodcoord.x = food['x']
-        foodcoord.y = food['y']
-        foodcoord.occupiedType = OccupiedType.FOOD
-
-        ns = a_star_search(getBoardCoords(game_state), sourcecoord, foodcoord)
-        if ns != None:
-            if manhattan(sourcecoord, foodcoord) < current_distance:
-                for snake in game_state['board']['snakes']:
-                    if snake['id'] != game_state['you']['id']:
-                        head = Coord()
-                        head.x = snake['head']['x']
-                        head.y = snake['head']['y']
-                        if manhattan(head, foodcoord) < manhattan(sourcecoord, foodcoord) or (manhattan(head, foodcoord) == manhattan(sourcecoord, foodcoord) and snake['length'] >= game_state['you']['length']):
-                            # print("Another snake is closer to the food \n")
-                            if ns.x == foodcoord.x and ns.y == foodcoord.y:
-                                # print("Next step is the food \n")
-                                if (ns.x == my_head['x'] + 1) and (ns.y
-                                            == my_head['y']):
-                                    is_move_safe['right'] = False
-                                if (ns.x == my_head['x'] - 1) and (ns.y
-                                                                            == my_head['y']):
-                                    is_move_safe['left'] = False
-                                if (ns.x == my_head['x']) and (ns.y
-                                                                        == my_head['y'] + 1):
-                                    is_move_safe['up'] = False
-                                if (ns.x == my_head['x']) and (ns.y
-                                                                        == my_head['y'] - 1):
-                                    is_move_safe['down'] = False
-                            next_step = None
-                            break
-                        else:
-                            current_distance = manhattan(sourcecoord, foodcoord)
-                            current_food = foodcoord
-                            next_step = ns
-            
-           
-        # else:
-            # print("No path found to food \n")
+    next_step = None
+
+    # One search from our head and one from each opponent head cover every food item:
+    # reachability, our first step and the "is another snake closer" race are all lookups.
+    with metrics.phase("search"):
+        mine = distance_field(board, ctx.head)
+        theirs = [(distance_field(board, head), length) for head, length in ctx.opponents]
+
+        for food in ctx.food:
+            distance = mine.dist[food]
+            if distance == -1 or distance >= current_distance:
+                # print("No path found to food \n")
+                continue
+            ns = mine.first_step[food]
+
+            contested = False
+            for field, length in theirs:
+                their_distance = field.dist[food]
+                if their_distance == -1:
+                    continue
+                margin = FOOD_RACE["vs_longer"] if length >= ctx.you_length else FOOD_RACE["vs_shorter"]
+                if distance - their_distance > margin:
+                    contested = True
+                    break
+
+            if contested:
+                # print("Another snake is closer to the food \n")
+                if distance == 1:
+                    # print("Next step is the food \n")
+                    is_move_safe[direction_to(board, ctx.head, ns)] = False
+                continue
+
+            current_distance = distance
+            current_food = food
+            next_step = ns
 
     if current_food != None and next_step != None:
-        # print(f"\nCurrent food: {current_food.x}, {current_food.y} \nNext step: {next_step.x}, {next_step.y}\n Current Pos: {sourcecoord.x}, {sourcecoord.y}")
-        is_move_safe = {"up": False, "down": False, "left": False, "right": False}
-        if (next_step.x == my_head['x'] + 1) and (next_step.y
-                                                    == my_head['y']):
-            is_move_safe['right'] = True
-        if (next_step.x == my_head['x'] - 1) and (next_step.y
-                                                    == my_head['y']):
-            is_move_safe['left'] = True
-        if (next_step.x == my_head['x']) and (next_step.y
-                                                == my_head['y'] + 1):
-            is_move_safe['up'] = True
-        if (next_step.x == my_head['x']) and (next_step.y
-                                                == my_head['y'] - 1):
-            is_move_safe['down'] = True
+        food_move = direction_to(board, ctx.head, next_step)
+        # Don't follow the food into a pocket smaller than we are when there is room elsewhere
+        length = ctx.you_length
+        if room(board, ctx.head, next_step, length) < length and any(
+            room(board, ctx.head, cell, length) >= length
+            for m, cell in zip(MOVES, steps) if is_move_safe[m] and m != food_move
+        ):
+            current_food = None
+        else:
+            # print(f"\nCurrent food: {board.xy(current_food)} \nNext step: {board.xy(next_step)}\n Current Pos: {board.xy(ctx.head)}")
+            is_move_safe = {"up": False, "down": False, "left": False, "right": False}
+            is_move_safe[food_move] = True
 
     # Are there any safe moves left?
     safe_moves = []
@@ -350,7 +418,23 @@ def move(game_state: typing.Dict) -> typing.Dict:
     if len(safe_moves) == 0:
         # print(f"MOVE {game_state['turn']}: No safe moves detected! Moving down")
         return {"move": "down"}
-    
+
+    if current_food == None:
+        # Nothing to eat: keep enough room to fit in
+        cell_for = dict(zip(MOVES, steps))
+        roomy = [m for m in safe_moves if room(board, ctx.head, cell_for[m], ctx.you_length) >= ctx.you_length]
+        if roomy:
+            safe_moves = roomy
+        # and, with an opponent close by, claim the most territory (the Voronoi pass
+        # needs numpy and its masks don't wrap around)
+        to_head = manhattan_for(board.width, board.height, board.wrapped)[ctx.head]
+        nearby = any(to_head[opp] <= CONTEST_DISTANCE for opp, _ in ctx.opponents)
+        if len(safe_moves) > 1 and nearby and analysis.ENABLED and not board.wrapped:
+            with metrics.phase("search"):
+                space = space_by_move(ctx)
+            best = max(space[m].territory for m in safe_moves)
+            safe_moves = [m for m in safe_moves if space[m].territory == best]
+
     next_move = random.choice(safe_moves)
 
     # TODO: Step 4 - Move towards food instead of random, to regain health and survive longer
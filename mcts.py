@@ -0,0 +1,219 @@
+# Monte Carlo Tree Search move policy.
+#
+# Decoupled UCT for simultaneous moves: every tree node keeps separate move
+# statistics for each snake, each snake picks its own move by UCB1, and the joint
+# move selects the child. New leaves are scored with a short random playout on the
+# same make/unmake Position the minimax search uses (see position.py), so the
+# rules - movement, eating, health, hazards and collisions - are shared. The tree
+# walk makes and unmakes moves on one Position; only playouts run on a copy.
+
+import math
+import os
+import random
+import time
+import typing
+
+from position import Position
+import search
+
+EXPLORATION = float(os.environ.get("MCTS_EXPLORATION", "1.4"))
+PLAYOUT_DEPTH = int(os.environ.get("MCTS_PLAYOUT_DEPTH", "10"))
+
+class MCTSResult(typing.NamedTuple):
+    move: str
+    playouts: int
+    elapsed_ms: float
+    playouts_per_sec: float
+    visits: typing.Dict[str, int]  # root visits per move, for merging parallel searches
+
+class Node:
+    __slots__ = ("moves", "visits", "totals", "n", "children")
+
+    def __init__(self, pos: Position):
+        # Eliminated snakes get a single placeholder move so joint moves keep their shape
+        tails = pos.moving_tails()
+        self.moves = [pos.safe_moves(i, tails) if pos.alive[i] else [0] for i in range(len(pos.bodies))]
+        self.visits = [[0] * len(m) for m in self.moves]
+        self.totals = [[0.0] * len(m) for m in self.moves]
+        self.n = 0
+        self.children: typing.Dict[typing.Tuple[int, ...], "Node"] = {}
+
+    # Index of each snake's UCB1 choice; unvisited moves are tried first
+    def select(self, exploration: float) -> typing.Tuple[int, ...]:
+        log_n = math.log(self.n) if self.n > 0 else 0.0
+        choice = []
+        for visits, totals in zip(self.visits, self.totals):
+            best = 0
+            best_value = -1.0
+            for k, v in enumerate(visits):
+                if v == 0:
+                    best = k
+                    break
+                value = totals[k] / v + exploration * math.sqrt(log_n / v)
+                if value > best_value:
+                    best_value = value
+                    best = k
+            choice.append(best)
+        return tuple(choice)
+
+    def update(self, choice: typing.Tuple[int, ...], rewards: typing.List[float]):
+        self.n += 1
+        for s, k in enumerate(choice):
+            self.visits[s][k] += 1
+            self.totals[s][k] += rewards[s]
+
+def is_terminal(pos: Position) -> bool:
+    alive = pos.alive_count()
+    return not pos.alive[0] or alive == 0 or (len(pos.alive) > 1 and alive == 1)
+
+# 0 for eliminated snakes, 1 for the last snake standing, 0.5 for everyone still alive otherwise
+def rewards_for(pos: Position) -> typing.List[float]:
+    alive = pos.alive_count()
+    if alive == 1 and len(pos.alive) > 1:
+        return [1.0 if a else 0.0 for a in pos.alive]
+    return [0.5 if a else 0.0 for a in pos.alive]
+
+# Random safe moves for every snake until the game ends or `depth` plies have passed.
+# The playout runs on a copy, which costs less than unmaking every ply. This is
+# Position.safe_moves plus a random pick, inlined: the moving tails are worked
+# out once per ply, and each snake tries its moves from a random start and takes
+# the first safe one (the first on-board one if none is safe).
+def playout(pos: Position, rng: random.Random, depth: int) -> typing.List[float]:
+    pos = pos.copy()
+    random_ = rng.random
+    bodies = pos.bodies
+    alive = pos.alive
+    occupied = pos.occupied
+    steps = pos.steps
+    make = pos.make
+    count = len(bodies)
+    for _ in range(depth):
+        if is_terminal(pos):
+            break
+        tails = pos.moving_tails()
+        moves = []
+        for i in range(count):
+            if not alive[i]:
+                moves.append(0)
+                continue
+            options = steps[bodies[i][0]]
+            first = int(random_() * 4)
+            move = -1
+            fallback = -1
+            for k in range(first, first + 4):
+                code = k & 3
+                nxt = options[code]
+                if nxt == -1:
+                    continue
+                if occupied[nxt] == 0 or (occupied[nxt] == 1 and nxt in tails):
+                    move = code
+                    break
+                if fallback == -1:
+                    fallback = code
+            moves.append(move if move != -1 else max(fallback, 0))
+        make(moves)
+    return rewards_for(pos)
+
+class Tree:
+    def __init__(self, pos: Position, rng: random.Random, exploration: float = EXPLORATION,
+                 playout_depth: int = PLAYOUT_DEPTH):
+        self.pos = pos
+        self.root = Node(pos)
+        self.rng = rng
+        self.exploration = exploration
+        self.playout_depth = playout_depth
+        self.playouts = 0
+
+    # One selection / expansion / playout / backpropagation pass
+    def iterate(self):
+        pos = self.pos
+        node = self.root
+        path = []
+        records = []
+        while True:
+            if is_terminal(pos):
+                rewards = rewards_for(pos)
+                break
+            choice = node.select(self.exploration)
+            joint = tuple(node.moves[s][k] for s, k in enumerate(choice))
+            path.append((node, choice))
+            records.append(pos.make(joint))
+            child = node.children.get(joint)
+            if child is None:
+                node.children[joint] = Node(pos)
+                rewards = playout(pos, self.rng, self.playout_depth)
+                break
+            node = child
+
+        for node, choice in path:
+            node.update(choice, rewards)
+        for record in reversed(records):
+            pos.unmake(record)
+        self.playouts += 1
+
+    # Upper bound on the nodes under the root: every iteration adds at most one
+    def size(self) -> int:
+        return self.root.n + 1
+
+    # Re-root the tree on the next turn's position, keeping the subtree of the joint
+    # move that was actually played. Food that spawned in the meantime is accepted as
+    # is; anything else that doesn't line up (a snake eliminated, a move we can't
+    # place) starts a fresh tree. Takes ownership of `pos`.
+    def advance(self, pos: Position) -> bool:
+        old = self.pos
+        joint = []
+        for i in range(len(old.bodies)):
+            if not old.alive[i]:
+                joint.append(0)
+                continue
+            if i >= len(pos.bodies) or not pos.alive[i]:
+                joint = None
+                break
+            steps = old.steps[old.bodies[i][0]]
+            head = pos.bodies[i][0]
+            if head not in steps:
+                joint = None
+                break
+            joint.append(steps.index(head))
+
+        child = self.root.children.get(tuple(joint)) if joint is not None else None
+        self.pos = pos
+        if child is None:
+            self.root = Node(pos)
+            return False
+        self.root = child
+        return True
+
+    def root_visits(self) -> typing.Dict[str, int]:
+        return {
+            self.pos.move_name(code): visits
+            for code, visits in zip(self.root.moves[0], self.root.visits[0])
+        }
+
+# Search for `budget_ms`. Pass `tree` to keep growing an existing tree (one carried
+# over from the previous turn); it is left holding this turn's results.
+def run(game_state: typing.Dict, budget_ms: typing.Optional[float] = None,
+        seed: typing.Optional[int] = None, pos: typing.Optional[Position] = None,
+        tree: typing.Optional[Tree] = None) -> MCTSResult:
+    start = time.perf_counter()
+    if budget_ms is None:
+        budget_ms = search.time_budget_ms(game_state)
+    deadline = start + budget_ms / 1000.0
+
+    if tree is None:
+        if pos is None:
+            pos = Position.from_game_state(game_state)
+        tree = Tree(pos, random.Random(seed))
+    playouts = 0
+    while True:
+        # Look at the clock every 16 playouts
+        if playouts & 15 == 0 and time.perf_counter() >= deadline:
+            break
+        tree.iterate()
+        playouts += 1
+
+    visits = tree.root_visits()
+    best = max(visits, key=visits.get)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    rate = playouts / (elapsed_ms / 1000.0) if elapsed_ms > 0 else 0.0
+    return MCTSResult(best, playouts, elapsed_ms, rate, visits)
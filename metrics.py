@@ -0,0 +1,146 @@
+# Request timing and search counters.
+#
+# /move is split into phases - JSON parse, board build, search and response
+# serialization - and each phase's time goes into a histogram, together with the
+# search counters (nodes expanded, depth reached, cache hits, playouts). The server
+# shows a snapshot on /metrics (answered for local requests only) and sends the
+# current request's phase times back in a Server-Timing header. Numbers are per
+# process: with several web workers each one keeps its own.
+#
+# Code on the move path marks a phase with `with metrics.phase("search"):`; outside
+# a request (benchmarks, the simulator) only the histograms are updated.
+
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+import typing
+
+ENABLED = os.environ.get("METRICS", "1") != "0"
+
+# Upper bounds of the histogram buckets; the last bucket takes everything above
+MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: typing.Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    # Upper bound of the bucket holding the p-th percentile
+    def percentile(self, p: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        buckets = {f"le_{b:g}": n for b, n in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+class Registry:
+    def __init__(self):
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._histograms: typing.Dict[str, Histogram] = {}
+        self._counters: typing.Dict[str, int] = {}
+
+    def observe(self, name: str, value: float, bounds: typing.Sequence[float] = MS_BUCKETS):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(bounds)
+            histogram.observe(value)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            return {
+                "uptime_s": round(time.monotonic() - self.started, 1),
+                "pid": os.getpid(),
+                "counters": dict(self._counters),
+                "histograms": {name: h.snapshot() for name, h in sorted(self._histograms.items())},
+            }
+
+REGISTRY = Registry()
+
+# Phase times of the request being handled. The deadline layer runs the handler
+# with a dict of its own and merges it back only when the handler finishes in time,
+# so a late handler can't keep writing to a dict the response is being built from.
+_timings: contextvars.ContextVar[typing.Optional[typing.Dict[str, float]]] = contextvars.ContextVar("timings", default=None)
+
+# Start collecting phase times for a request; returns the dict they are added to
+def begin() -> typing.Dict[str, float]:
+    timings: typing.Dict[str, float] = {}
+    _timings.set(timings)
+    return timings
+
+# Add phase times collected in another context (a finished worker's dict) to this request's
+def merge(timings: typing.Dict[str, float]):
+    current = _timings.get()
+    if current is None:
+        return
+    for name, elapsed_ms in timings.items():
+        current[name] = current.get(name, 0.0) + elapsed_ms
+
+def record(name: str, elapsed_ms: float):
+    if not ENABLED:
+        return
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + elapsed_ms
+    REGISTRY.observe(f"{name}_ms", elapsed_ms)
+
+@contextlib.contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000.0)
+
+def observe(name: str, value: float, bounds: typing.Sequence[float] = COUNT_BUCKETS):
+    if ENABLED:
+        REGISTRY.observe(name, value, bounds)
+
+def count(name: str, n: int = 1):
+    if ENABLED:
+        REGISTRY.count(name, n)
+
+# Server-Timing header value, e.g. "parse;dur=0.12, board;dur=0.31, search;dur=4.02"
+def server_timing(timings: typing.Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.2f}" for name, ms in timings.items())
+
+def snapshot() -> typing.Dict[str, typing.Any]:
+    return REGISTRY.snapshot()
@@ -0,0 +1,61 @@
+# Ponder mode: keep searching while we wait for the next /move.
+#
+# After we answer a turn, a background thread keeps growing that turn's MCTS tree.
+# The root's children are exactly the positions that can come next, so by the time
+# the next request arrives the subtree of the move that was actually played has
+# had extra playouts; mcts.Tree.advance re-roots on it and the rest is dropped.
+#
+# A ponderer gets at most PONDER_CPU_SHARE of a core (it sleeps between batches),
+# stops growing the tree past PONDER_MAX_NODES, gives up after PONDER_MAX_S
+# without a new request, and is cancelled on the next /move or on /end.
+
+import os
+import threading
+import time
+import typing
+
+import mcts
+
+ENABLED = os.environ.get("PONDER", "0") == "1"
+CPU_SHARE = min(max(float(os.environ.get("PONDER_CPU_SHARE", "0.5")), 0.05), 1.0)
+MAX_NODES = int(os.environ.get("PONDER_MAX_NODES", "200000"))
+MAX_SECONDS = float(os.environ.get("PONDER_MAX_S", "5"))
+BATCH = 16  # playouts between CPU-share sleeps
+
+class Ponderer(threading.Thread):
+    def __init__(self, tree: mcts.Tree):
+        super().__init__(name="ponder", daemon=True)
+        self.tree = tree
+        self.playouts = 0
+        self._cancelled = threading.Event()
+
+    def run(self):
+        tree = self.tree
+        give_up = time.monotonic() + MAX_SECONDS
+        while tree.size() < MAX_NODES and time.monotonic() < give_up:
+            started = time.perf_counter()
+            for _ in range(BATCH):
+                tree.iterate()
+            self.playouts += BATCH
+            worked = time.perf_counter() - started
+            # Sleep long enough that working time stays at CPU_SHARE of the wall clock
+            if self._cancelled.wait(worked * (1.0 - CPU_SHARE) / CPU_SHARE):
+                break
+
+    # Stop and wait for the current batch to finish, so the tree is ours again
+    def cancel(self) -> int:
+        self._cancelled.set()
+        self.join()
+        return self.playouts
+
+def start(cache: typing.Dict[str, typing.Any], tree: mcts.Tree):
+    ponderer = Ponderer(tree)
+    cache["ponderer"] = ponderer
+    ponderer.start()
+
+# Cancel the game's ponderer, if any; returns the playouts it added
+def stop(cache: typing.Dict[str, typing.Any]) -> int:
+    ponderer = cache.pop("ponderer", None)
+    if ponderer is None:
+        return 0
+    return ponderer.cancel()
@@ -0,0 +1,144 @@
+# Persistent process pool for multi-core move search.
+#
+# One Python thread can only run one search at a time, so `run_server` starts a
+# pool of worker processes at boot and /move fans its search out across them:
+# root-parallel MCTS (every worker grows its own tree, root visits are summed) or
+# split root moves for minimax (every worker searches a share of our moves). The
+# workers import the engines and run a throwaway search before the first request,
+# so no fork or import cost ever lands on a /move.
+
+import concurrent.futures
+import multiprocessing
+import os
+import time
+import typing
+
+import mcts
+import search
+from position import Position
+
+WORKERS = int(os.environ.get("SEARCH_WORKERS", "0"))  # 0 disables the pool
+# Time kept back from each worker's budget for pickling the request and the answer
+IPC_MARGIN_MS = float(os.environ.get("SEARCH_POOL_MARGIN_MS", "15"))
+
+_executor: typing.Optional[concurrent.futures.ProcessPoolExecutor] = None
+_size = 0
+
+def _warm_state() -> typing.Dict:
+    body = [{"x": 1, "y": 3}, {"x": 1, "y": 2}, {"x": 1, "y": 1}]
+    snake = {"id": "warm", "health": 100, "body": body, "head": body[0], "length": 3}
+    return {
+        "game": {"id": "warm", "timeout": 500},
+        "turn": 0,
+        "board": {"width": 11, "height": 11, "food": [{"x": 5, "y": 5}], "hazards": [], "snakes": [snake]},
+        "you": snake,
+    }
+
+def _warm_worker():
+    # Fill the per-size tables and run each engine once so the first real request
+    # doesn't pay for it
+    state = _warm_state()
+    search.iterative_deepening(state, budget_ms=5)
+    mcts.run(state, budget_ms=5)
+
+def _ping(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+def _run_mcts(game_state: typing.Dict, budget_ms: float, seed: int) -> mcts.MCTSResult:
+    return mcts.run(game_state, budget_ms=budget_ms, seed=seed)
+
+def _run_minimax(game_state: typing.Dict, budget_ms: float, root_moves: typing.List[str]) -> search.SearchResult:
+    return search.iterative_deepening(game_state, budget_ms=budget_ms, root_moves=root_moves)
+
+def start(workers: int = WORKERS) -> bool:
+    global _executor, _size
+    if workers <= 0 or _executor is not None:
+        return _executor is not None
+    # fork shares the already imported modules with the workers; fall back to the
+    # platform default where fork isn't available
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    _executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_warm_worker
+    )
+    _size = workers
+    # Workers are spawned on demand; keep them all busy at once so every one is
+    # started (and warmed by the initializer) before we return
+    pids = set(_executor.map(_ping, [0.05] * workers))
+    print(f"Search pool ready: {len(pids)} warm worker(s)")
+    return True
+
+def stop():
+    global _executor, _size
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _size = 0
+
+def active() -> bool:
+    return _executor is not None
+
+def size() -> int:
+    return _size
+
+# Results that arrived before the deadline; late workers are ignored, not waited on
+def _collect(futures: typing.List[concurrent.futures.Future], budget_ms: float) -> list:
+    done, _ = concurrent.futures.wait(futures, timeout=(budget_ms + IPC_MARGIN_MS) / 1000.0)
+    results = []
+    for future in done:
+        if future.exception() is None:
+            results.append(future.result())
+    return results
+
+def parallel_mcts(game_state: typing.Dict, budget_ms: typing.Optional[float] = None) -> typing.Optional[mcts.MCTSResult]:
+    if _executor is None:
+        return None
+    start_time = time.perf_counter()
+    if budget_ms is None:
+        budget_ms = search.time_budget_ms(game_state)
+    worker_budget = max(budget_ms - IPC_MARGIN_MS, 1.0)
+    turn = game_state.get('turn', 0)
+    futures = [
+        _executor.submit(_run_mcts, game_state, worker_budget, turn * _size + i)
+        for i in range(_size)
+    ]
+    results = _collect(futures, worker_budget)
+    if not results:
+        return None
+
+    visits: typing.Dict[str, int] = {}
+    for result in results:
+        for move, count in result.visits.items():
+            visits[move] = visits.get(move, 0) + count
+    playouts = sum(r.playouts for r in results)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+    return mcts.MCTSResult(
+        max(visits, key=visits.get), playouts, elapsed_ms, playouts / (elapsed_ms / 1000.0), visits
+    )
+
+def parallel_minimax(game_state: typing.Dict, budget_ms: typing.Optional[float] = None) -> typing.Optional[search.SearchResult]:
+    if _executor is None:
+        return None
+    start_time = time.perf_counter()
+    if budget_ms is None:
+        budget_ms = search.time_budget_ms(game_state)
+    worker_budget = max(budget_ms - IPC_MARGIN_MS, 1.0)
+
+    pos = Position.from_game_state(game_state)
+    moves = [pos.move_name(m) for m in pos.safe_moves(0)]
+    if len(moves) == 1:
+        return search.SearchResult(moves[0], 0.0, 0, 0, 0.0)
+    # Deal our moves out round-robin, one share per worker
+    shares = [moves[i::_size] for i in range(min(_size, len(moves)))]
+    futures = [_executor.submit(_run_minimax, game_state, worker_budget, share) for share in shares]
+    results = _collect(futures, worker_budget)
+    if not results:
+        return None
+
+    best = max(results, key=lambda r: r.score)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+    return search.SearchResult(
+        best.move, best.score, min(r.depth for r in results), sum(r.nodes for r in results), elapsed_ms,
+        sum(r.cache_hits for r in results),
+    )
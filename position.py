@@ -0,0 +1,294 @@
+# Mutable game position for search, with make/unmake moves.
+#
+# Snakes are deques of board indices (head first) and occupancy is a per-cell
+# segment count, so a search node costs a few integer updates instead of a copy
+# of the board. make() returns an undo record; unmake() with that record restores
+# the position exactly.
+#
+# Rules follow the standard ruleset: every snake moves at once, loses 1 health
+# (plus hazard damage on hazard cells), eats food under its new head, and is then
+# eliminated for running out of health, leaving the board, hitting any body, or
+# losing a head-to-head.
+
+import typing
+from collections import deque
+
+from board import MOVES, neighbours_for, steps_for
+import gamestate
+
+MAX_HEALTH = 100
+DEFAULT_HAZARD_DAMAGE = gamestate.DEFAULT_HAZARD_DAMAGE
+
+# Undo record for a single snake: (moved, old tail, old health, grew, eliminated)
+SnakeUndo = typing.Tuple[bool, int, int, bool, bool]
+
+class Position:
+    __slots__ = (
+        "width", "height", "neighbours", "steps",
+        "ids", "bodies", "health", "alive",
+        "occupied", "food", "hazards", "hazard_damage",
+    )
+
+    # On a wrapped board the step table wraps around the edges, so nobody ever leaves it
+    def __init__(self, width: int, height: int, wrapped: bool = False):
+        self.width = width
+        self.height = height
+        self.neighbours = neighbours_for(width, height, wrapped)
+        self.steps = steps_for(width, height, wrapped)
+        self.ids: typing.List[str] = []
+        self.bodies: typing.List[typing.Deque[int]] = []
+        self.health: typing.List[int] = []
+        self.alive: typing.List[bool] = []
+        self.occupied = bytearray(width * height)  # body segments per cell (stacked segments count twice)
+        self.food = bytearray(width * height)
+        self.hazards = bytearray(width * height)  # hazard layers per cell
+        self.hazard_damage = DEFAULT_HAZARD_DAMAGE
+
+    # Snake 0 is always `you`; the others keep the order the engine sent them in
+    @classmethod
+    def from_game_state(cls, game_state: typing.Dict) -> "Position":
+        state = gamestate.compact(game_state)
+        pos = cls(state.width, state.height, state.wrapped)
+
+        snakes = [s for s in state.snakes if s.id == state.you.id]
+        snakes += [s for s in state.snakes if s.id != state.you.id]
+        for snake in snakes:
+            body = deque(snake.body)
+            for idx in body:
+                pos.occupied[idx] += 1
+            pos.ids.append(snake.id)
+            pos.bodies.append(body)
+            pos.health.append(snake.health)
+            pos.alive.append(True)
+
+        for idx in state.food:
+            pos.food[idx] = 1
+        for idx in state.hazards:
+            pos.hazards[idx] += 1
+        pos.hazard_damage = state.hazard_damage
+        return pos
+
+    # Bring the position up to date with the next turn's payload by applying only
+    # what changed: heads advance, tails retract (or stay to grow), health is copied,
+    # eliminated snakes are lifted off the board and food/hazards are diffed.
+    # Returns False when the payload can't be reached that way (a new snake, a
+    # different board); the caller should build a fresh Position instead.
+    def sync(self, game_state: typing.Dict) -> bool:
+        board = game_state['board']
+        if board['width'] != self.width or board['height'] != self.height:
+            return False
+        width = self.width
+        occupied = self.occupied
+        snakes = {s['id']: s for s in board['snakes']}
+        if any(snake_id not in self.ids for snake_id in snakes):
+            return False
+
+        for i, snake_id in enumerate(self.ids):
+            body = self.bodies[i]
+            snake = snakes.get(snake_id)
+            if snake is None:
+                if self.alive[i]:
+                    self.alive[i] = False
+                    for idx in body:
+                        occupied[idx] -= 1
+                continue
+            if not self.alive[i]:
+                return False
+
+            new_body = snake['body']
+            head = new_body[0]['y'] * width + new_body[0]['x']
+            if head != body[0]:
+                body.appendleft(head)
+                occupied[head] += 1
+                occupied[body.pop()] -= 1
+            while len(body) < len(new_body):
+                body.append(body[-1])
+                occupied[body[-1]] += 1
+            while len(body) > len(new_body):
+                occupied[body.pop()] -= 1
+            tail = new_body[-1]
+            if body[-1] != tail['y'] * width + tail['x'] or (len(body) > 1 and body[1] != new_body[1]['y'] * width + new_body[1]['x']):
+                # Not a plain one-step move (shouldn't happen between consecutive turns)
+                for idx in body:
+                    occupied[idx] -= 1
+                body.clear()
+                body.extend(seg['y'] * width + seg['x'] for seg in new_body)
+                for idx in body:
+                    occupied[idx] += 1
+            self.health[i] = snake['health']
+
+        food = self.food
+        new_food = {f['y'] * width + f['x'] for f in board['food']}
+        for idx in [i for i, has_food in enumerate(food) if has_food and i not in new_food]:
+            food[idx] = 0
+        for idx in new_food:
+            food[idx] = 1
+
+        # Hazards are replaced, never changed in place, because copies share them
+        hazards = bytearray(width * self.height)
+        for hazard in board.get('hazards', ()):
+            hazards[hazard['y'] * width + hazard['x']] += 1
+        if hazards != self.hazards:
+            self.hazards = hazards
+        return True
+
+    def copy(self) -> "Position":
+        pos = Position.__new__(Position)
+        pos.width = self.width
+        pos.height = self.height
+        pos.neighbours = self.neighbours
+        pos.steps = self.steps
+        pos.ids = self.ids
+        pos.bodies = [deque(body) for body in self.bodies]
+        pos.health = list(self.health)
+        pos.alive = list(self.alive)
+        pos.occupied = bytearray(self.occupied)
+        pos.food = bytearray(self.food)
+        pos.hazards = self.hazards
+        pos.hazard_damage = self.hazard_damage
+        return pos
+
+    def head(self, snake: int) -> int:
+        return self.bodies[snake][0]
+
+    def length(self, snake: int) -> int:
+        return len(self.bodies[snake])
+
+    # Moves that stay on the board and don't run into a body segment that will still
+    # be there next turn (a tail is fine unless it is stacked because its owner just ate).
+    # Falls back to every on-board move, then to "up", so a snake always has a move.
+    # Pass `tails` (moving_tails()) when asking for several snakes in the same position.
+    def safe_moves(self, snake: int, tails: typing.Optional[typing.Set[int]] = None) -> typing.List[int]:
+        if tails is None:
+            tails = self.moving_tails()
+        occupied = self.occupied
+        moves = []
+        on_board = []
+        for code, nxt in enumerate(self.steps[self.bodies[snake][0]]):
+            if nxt == -1:
+                continue
+            on_board.append(code)
+            if occupied[nxt] == 0 or (occupied[nxt] == 1 and nxt in tails):
+                moves.append(code)
+        return moves or on_board or [0]
+
+    # Cells of the tails that move away next turn (not stacked because their owner just ate)
+    def moving_tails(self) -> typing.Set[int]:
+        alive = self.alive
+        return {
+            body[-1] for i, body in enumerate(self.bodies)
+            if alive[i] and (len(body) == 1 or body[-2] != body[-1])
+        }
+
+    # Apply one move code per snake (ignored for eliminated snakes) and return the undo record
+    def make(self, moves: typing.Sequence[int]):
+        bodies = self.bodies
+        health = self.health
+        alive = self.alive
+        occupied = self.occupied
+        food = self.food
+        steps = self.steps
+        hazards = self.hazards
+        count = len(bodies)
+
+        # Per snake (moved, old tail, old health, grew); the eliminated flag is added at the end
+        moved = [(False, -1, h, False) for h in health]
+        eaten = []
+        out = []  # left the board or starved
+
+        # 1) Move every snake at once, then apply health, hazards and feeding. A snake
+        #    only ever eats under its own new head, so both can happen in one pass.
+        for i in range(count):
+            if not alive[i]:
+                continue
+            body = bodies[i]
+            old_health = health[i]
+            head = steps[body[0]][moves[i]]
+            if head == -1:
+                out.append(i)
+                continue
+            body.appendleft(head)
+            occupied[head] += 1
+            tail = body.pop()
+            occupied[tail] -= 1
+
+            hp = old_health - 1
+            if hazards[head]:
+                hp -= self.hazard_damage * hazards[head]
+            grew = False
+            if food[head]:
+                hp = MAX_HEALTH
+                body.append(body[-1])
+                occupied[body[-1]] += 1
+                grew = True
+                if head not in eaten:
+                    eaten.append(head)
+            health[i] = hp
+            if hp <= 0:
+                out.append(i)
+            moved[i] = (True, tail, old_health, grew)
+        for idx in eaten:
+            food[idx] = 0
+
+        # 2) Eliminations. Starved and out-of-bounds snakes go first and don't take
+        #    part in collisions; collisions are then decided for everyone at once.
+        eliminated = [False] * count
+        for i in out:
+            eliminated[i] = True
+            alive[i] = False
+            for idx in bodies[i]:
+                occupied[idx] -= 1
+
+        collided = []
+        for i in range(count):
+            if not alive[i]:
+                continue
+            head = bodies[i][0]
+            if occupied[head] == 1:
+                # Nothing else on this cell: no body hit and no head-to-head
+                continue
+            heads_here = 0
+            for j in range(count):
+                if alive[j] and bodies[j][0] == head:
+                    heads_here += 1
+                    if j != i and len(bodies[j]) >= len(bodies[i]):
+                        collided.append(i)
+                        break
+            else:
+                if occupied[head] > heads_here:
+                    collided.append(i)
+        for i in collided:
+            eliminated[i] = True
+            alive[i] = False
+            for idx in bodies[i]:
+                occupied[idx] -= 1
+
+        undo: typing.List[SnakeUndo] = [entry + (eliminated[i],) for i, entry in enumerate(moved)]
+        return undo, eaten
+
+    def unmake(self, record) -> None:
+        undo, eaten = record
+        bodies = self.bodies
+        occupied = self.occupied
+
+        for idx in eaten:
+            self.food[idx] = 1
+        for i, (moved, tail, old_health, grew, eliminated) in enumerate(undo):
+            body = bodies[i]
+            if eliminated:
+                self.alive[i] = True
+                for idx in body:
+                    occupied[idx] += 1
+            if grew:
+                occupied[body.pop()] -= 1
+            if moved:
+                occupied[body.popleft()] -= 1
+                body.append(tail)
+                occupied[tail] += 1
+            self.health[i] = old_health
+
+    def alive_count(self) -> int:
+        return sum(self.alive)
+
+    def move_name(self, code: int) -> str:
+        return MOVES[code]
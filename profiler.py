@@ -0,0 +1,168 @@
+# Sampling profiler for live /move traffic.
+#
+# When on, PROFILE_PERCENT of /move calls are profiled: a background thread looks
+# at the handler thread's stack every PROFILE_INTERVAL_MS (sys._current_frames, so
+# the handler itself runs untouched) and counts each distinct stack. Stacks from
+# calls that took at least PROFILE_MIN_MS are added to a per-process file in
+# PROFILE_DIR, in the collapsed "frame;frame;frame count" format flamegraph.pl and
+# speedscope read. Setting PROFILE_MIN_MS to e.g. 300 keeps only the slow turns.
+#
+# Off, the wrapper costs one attribute check per call and no thread is running.
+# It can be switched on and off at runtime through /profile (see server.py).
+
+import collections
+import os
+import random
+import sys
+import threading
+import time
+import typing
+
+ENABLED = os.environ.get("PROFILE", "0") == "1"
+PERCENT = float(os.environ.get("PROFILE_PERCENT", "10"))
+INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "1"))
+MIN_MS = float(os.environ.get("PROFILE_MIN_MS", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+FLUSH_EVERY_S = 1.0
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Sampler:
+    def __init__(self, percent: float = PERCENT, interval_ms: float = INTERVAL_MS,
+                 min_ms: float = MIN_MS, directory: str = PROFILE_DIR):
+        self.enabled = False
+        self.percent = percent
+        self.interval_ms = interval_ms
+        self.min_ms = min_ms
+        self.directory = directory
+        self.profiled = 0  # calls sampled
+        self.kept = 0  # calls whose stacks were kept
+        self.samples = 0
+        self.stacks: typing.Counter[str] = collections.Counter()
+        self._lock = threading.Lock()
+        # thread id -> (frame the profiled call started from, its stack counts)
+        self._targets: typing.Dict[int, typing.Tuple[typing.Any, typing.Counter[str]]] = {}
+        self._wake = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._dirty = False
+        self._flushed = 0.0
+
+    def configure(self, enabled: typing.Optional[bool] = None, percent: typing.Optional[float] = None,
+                  interval_ms: typing.Optional[float] = None, min_ms: typing.Optional[float] = None):
+        if percent is not None:
+            self.percent = min(max(percent, 0.0), 100.0)
+        if interval_ms is not None:
+            self.interval_ms = max(interval_ms, 0.1)
+        if min_ms is not None:
+            self.min_ms = max(min_ms, 0.0)
+        if enabled is not None:
+            self.enabled = enabled
+            if enabled:
+                self._ensure_thread()
+            else:
+                self.flush()
+
+    # The sampling thread; also restarts it in a forked web worker, where it doesn't exist
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def status(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "enabled": self.enabled,
+            "percent": self.percent,
+            "interval_ms": self.interval_ms,
+            "min_ms": self.min_ms,
+            "profiled": self.profiled,
+            "kept": self.kept,
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "file": self.path(),
+        }
+
+    def path(self) -> str:
+        return os.path.join(self.directory, f"move-{os.getpid()}.folded")
+
+    def _run(self):
+        while self.enabled:
+            if not self._targets:
+                self._wake.wait(FLUSH_EVERY_S)
+                self._wake.clear()
+            else:
+                self._sample()
+                time.sleep(self.interval_ms / 1000.0)
+            if self._dirty and time.monotonic() - self._flushed >= FLUSH_EVERY_S:
+                self.flush()
+
+    def _sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, (stop, counts) in self._targets.items():
+                frame = frames.get(ident)
+                names = []
+                while frame is not None and frame is not stop:
+                    names.append(frame_name(frame))
+                    frame = frame.f_back
+                if names:
+                    counts[";".join(reversed(names))] += 1
+
+    # Run `fn(*args)` on this thread while sampling its stack
+    def profile(self, fn: typing.Callable[..., typing.Any], *args: typing.Any) -> typing.Any:
+        ident = threading.get_ident()
+        counts: typing.Counter[str] = collections.Counter()
+        with self._lock:
+            self._targets[ident] = (sys._getframe(), counts)
+            self._ensure_thread()
+        self._wake.set()
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                self._targets.pop(ident, None)
+                self.profiled += 1
+                if elapsed_ms >= self.min_ms and counts:
+                    self.stacks.update(counts)
+                    self.samples += sum(counts.values())
+                    self.kept += 1
+                    self._dirty = True
+
+    # Rewrite this process's stack file with everything collected so far
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            lines = [f"{stack} {n}\n" for stack, n in self.stacks.most_common()]
+            self._dirty = False
+            self._flushed = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path()
+        with open(path + ".tmp", "w") as f:
+            f.writelines(lines)
+        os.replace(path + ".tmp", path)
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.profiled = self.kept = self.samples = 0
+            self._dirty = True
+
+SAMPLER = Sampler()
+if ENABLED:
+    SAMPLER.configure(enabled=True)
+
+# Wrap a move handler so a share of its calls are profiled
+def profiling(move_handler: typing.Callable[[typing.Dict], typing.Dict]) -> typing.Callable[[typing.Dict], typing.Dict]:
+    sampler = SAMPLER
+    rng = random.Random()  # leave the global generator to the snakes
+
+    def profiled_move(game_state: typing.Dict) -> typing.Dict:
+        if not sampler.enabled or rng.random() * 100.0 >= sampler.percent:
+            return move_handler(game_state)
+        return sampler.profile(move_handler, game_state)
+
+    return profiled_move
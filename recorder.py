@@ -0,0 +1,134 @@
+# Opt-in /move recorder.
+#
+# With RECORD_DIR set, every /move request is appended together with our answer,
+# how long it took and the seed the global `random` had for that turn to a
+# gzip-compressed JSON-lines file in that directory.
+# Files are rotated once they pass RECORD_MAX_BYTES (compressed) and are named by
+# start time and process id, so several web workers can record side by side.
+# replay.py feeds a recorded corpus back through any move handler, seeding
+# `random` the same way, so random tie-breaks are replayed rather than reported
+# as changed moves.
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import typing
+import zlib
+
+RECORD_DIR = os.environ.get("RECORD_DIR", "")
+MAX_BYTES = int(os.environ.get("RECORD_MAX_BYTES", str(16 * 1024 * 1024)))
+FLUSH_EVERY = 64  # records between flushes of the compressed stream
+
+ENABLED = bool(RECORD_DIR)
+
+class Recorder:
+    # With `path`, everything goes to that one file and it is never rotated
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES, path: typing.Optional[str] = None):
+        self.directory = directory
+        self.path = path
+        self.max_bytes = max_bytes
+        self.records = 0
+        self._lock = threading.Lock()
+        self._raw = None
+        self._file = None
+        self._pending = 0
+
+    def _open(self):
+        path = self.path
+        if path is None:
+            os.makedirs(self.directory, exist_ok=True)
+            name = time.strftime("moves-%Y%m%d-%H%M%S") + f"-{os.getpid()}.jsonl.gz"
+            path = os.path.join(self.directory, name)
+            suffix = 1
+            while os.path.exists(path):
+                path = os.path.join(self.directory, name.replace(".jsonl.gz", f"-{suffix}.jsonl.gz"))
+                suffix += 1
+        self._raw = open(path, "wb")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="wb")
+
+    def write(self, record: typing.Dict):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self.records += 1
+            self._pending += 1
+            if self._pending >= FLUSH_EVERY:
+                self._file.flush()
+                self._pending = 0
+                if self.path is None and self._raw.tell() >= self.max_bytes:
+                    self._close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._raw.close()
+            self._file = self._raw = None
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+_recorder: typing.Optional[Recorder] = None
+
+def recorder() -> Recorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder(RECORD_DIR)
+    return _recorder
+
+# Seed for the global `random` on one turn of one game
+def turn_seed(game_id: str, turn: int) -> int:
+    return zlib.crc32(f"{game_id}:{turn}".encode())
+
+# Wrap a move handler so each call is recorded with its answer, latency and seed
+def recording(move_handler: typing.Callable[[typing.Dict], typing.Dict]) -> typing.Callable[[typing.Dict], typing.Dict]:
+    def recorded_move(game_state: typing.Dict) -> typing.Dict:
+        game_id = game_state.get('game', {}).get('id')
+        turn = game_state.get('turn')
+        seed = turn_seed(game_id or "", turn or 0)
+        random.seed(seed)
+        start = time.perf_counter()
+        response = move_handler(game_state)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        recorder().write({
+            "time": time.time(),
+            "game_id": game_id,
+            "turn": turn,
+            "seed": seed,
+            "ms": round(elapsed_ms, 3),
+            "request": game_state,
+            "response": response,
+        })
+        return response
+
+    return recorded_move
+
+def close():
+    if _recorder is not None:
+        _recorder.close()
+
+# Records from a file or a directory of recordings, oldest file first
+def read_records(path: str) -> typing.Iterator[typing.Dict]:
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.endswith(".jsonl.gz") or name.endswith(".jsonl")
+        )
+    else:
+        files = [path]
+    for name in files:
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, json.JSONDecodeError):
+                # A file still being written (or cut off by a crash) ends mid-stream
+                continue
@@ -0,0 +1,104 @@
+# Replay recorded /move requests through a move handler.
+#
+# Feeds a corpus written by recorder.py (RECORD_DIR) back through any handler -
+# main, one of the example snakes, or any importable module with a `move` - and
+# reports per-turn latency percentiles and every turn where the chosen move differs
+# from the recorded one, so a refactor can be checked against real positions.
+# The global `random` is seeded per turn with the seed the recording stored (see
+# recorder.py), so handlers that break ties randomly give the answers they gave
+# live. Time-budgeted searches (minimax, mcts) can still differ when the machine
+# reaches a different depth or playout count.
+#
+# Usage:
+#   python replay.py recordings/ --handler main
+#   python replay.py recordings/ --handler dodge --repeat 5
+#   python replay.py recordings/ --handler main --write replayed.jsonl.gz
+#   python replay.py replayed.jsonl.gz --handler main   # compare against an earlier replay
+
+import argparse
+import contextlib
+import io
+import random
+import time
+import typing
+
+import recorder
+from simulator import SNAKES, load_handlers
+
+class ReplayResult(typing.NamedTuple):
+    turns: int
+    latencies_ms: typing.List[float]
+    changed: typing.List[typing.Tuple[str, int, str, str]]  # game id, turn, recorded, replayed
+    failed: int
+
+def percentile(values: typing.Sequence[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(p / 100.0 * len(ordered)), len(ordered) - 1)]
+
+def replay(path: str, handler: typing.Callable[[typing.Dict], typing.Dict], repeat: int = 1,
+           writer: typing.Optional[recorder.Recorder] = None) -> ReplayResult:
+    latencies = []
+    changed = []
+    failed = 0
+    turns = 0
+    for record in recorder.read_records(path):
+        game_state = record["request"]
+        game_id = record.get("game_id") or game_state.get('game', {}).get('id', "")
+        turn = record.get("turn", game_state.get('turn', 0))
+        expected = (record.get("response") or {}).get("move")
+        # Older recordings carry no seed; earlier replays (--write) used this same formula
+        seed = record.get("seed", recorder.turn_seed(game_id, turn))
+
+        best_ms = None
+        response = None
+        for _ in range(repeat):
+            random.seed(seed)
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = handler(game_state)
+            except Exception:
+                response = None
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            best_ms = elapsed_ms if best_ms is None else min(best_ms, elapsed_ms)
+
+        turns += 1
+        latencies.append(best_ms)
+        if response is None:
+            failed += 1
+            continue
+        move = response.get("move")
+        if move != expected:
+            changed.append((game_id, turn, expected, move))
+        if writer is not None:
+            writer.write({"time": time.time(), "game_id": game_id, "turn": turn, "seed": seed,
+                          "ms": round(best_ms, 3), "request": game_state, "response": response})
+    return ReplayResult(turns, latencies, changed, failed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded /move requests through a move handler.")
+    parser.add_argument("path", help="recording file or RECORD_DIR directory")
+    parser.add_argument("--handler", default="main", help=f"{', '.join(SNAKES)} or an importable module with move()")
+    parser.add_argument("--repeat", type=int, default=1, help="run each turn N times and keep the fastest")
+    parser.add_argument("--write", help="write the replayed answers as a new (gzip) recording, to compare against later")
+    parser.add_argument("--show", type=int, default=20, help="changed moves to list")
+    args = parser.parse_args()
+
+    writer = recorder.Recorder("", path=args.write) if args.write else None
+
+    result = replay(args.path, load_handlers(args.handler)["move"], args.repeat, writer)
+    if writer is not None:
+        writer.close()
+
+    lat = result.latencies_ms
+    print(f"{result.turns} turns replayed through {args.handler}, {result.failed} failed")
+    print(f"latency ms: p50 {percentile(lat, 50):.2f}  p90 {percentile(lat, 90):.2f}  "
+          f"p99 {percentile(lat, 99):.2f}  max {max(lat, default=0.0):.2f}")
+    print(f"{len(result.changed)} moves changed ({100.0 * len(result.changed) / result.turns if result.turns else 0:.1f}%)")
+    for game_id, turn, expected, move in result.changed[:args.show]:
+        print(f"  {game_id} turn {turn}: {expected} -> {move}")
+
+if __name__ == "__main__":
+    main()
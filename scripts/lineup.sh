@@ -0,0 +1,34 @@
+# Shared by run_board_rules.sh and versus_friend.sh (sourced, not run):
+# expands lineup servers among the candidate snake URLs.
+
+# A lineup server (python lineup.py) lists its snakes at / ; each one is served under /<name>
+lineup_paths() {
+  local url="$1"
+  local json
+  json="$(curl -fsS "${url%/}/" 2>/dev/null || true)"
+  [[ -n "$json" ]] && command -v python3 >/dev/null 2>&1 || return 0
+  python3 - <<'PY' "$json" 2>/dev/null || true
+import sys, json
+try:
+    for name in json.loads(sys.argv[1]).get("snakes", []):
+        print(name)
+except Exception:
+    pass
+PY
+}
+
+# Prints the given URLs one per line, with every lineup server replaced by its snakes
+expand_lineup_urls() {
+  local url path
+  local -a paths
+  for url in "$@"; do
+    mapfile -t paths < <(lineup_paths "$url")
+    if [[ "${#paths[@]}" -gt 0 ]]; then
+      for path in "${paths[@]}"; do
+        echo "${url%/}/${path}"
+      done
+    else
+      echo "$url"
+    fi
+  done
+}
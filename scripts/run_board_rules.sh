@@ -7,6 +7,9 @@ set -euo pipefail
 log()  { printf "\033[1;34m[run]\033[0m %s\n" "$*"; }
 die()  { echo "❌ $*" >&2; exit 1; }
 
+# shellcheck source=lineup.sh
+source "$(dirname "${BASH_SOURCE[0]}")/lineup.sh"
+
 BOARD_PID=""
 CLI_PID=""
 
@@ -14,6 +17,10 @@ cleanup() {
   set +e
   [[ -n "${CLI_PID:-}"   ]] && kill "$CLI_PID"   2>/dev/null || true
   [[ -n "${BOARD_PID:-}" ]] && kill "$BOARD_PID" 2>/dev/null || true
+  # Tournament games still running
+  local pids
+  pids="$(jobs -pr)"
+  [[ -n "$pids" ]] && kill $pids 2>/dev/null || true
 }
 trap cleanup EXIT
 
@@ -67,10 +74,63 @@ BOARD_URL="${_base}:${BOARD_PORT_PUBLIC}"
 WAIT_STEPS="${WAIT_STEPS:-80}"     # 80 * 0.25s ≈ 20s
 WAIT_INTERVAL="${WAIT_INTERVAL:-0.25}"
 
+# Headless tournament: TOURNAMENT_GAMES > 0 skips the board UI and plays that many
+# CLI games, TOURNAMENT_JOBS at a time, then writes a summary
+TOURNAMENT_GAMES="${TOURNAMENT_GAMES:-0}"
+TOURNAMENT_JOBS="${TOURNAMENT_JOBS:-$(nproc 2>/dev/null || echo 4)}"
+TOURNAMENT_DIR="${TOURNAMENT_DIR:-tournaments/$(date +%Y%m%d-%H%M%S)}"
+TOURNAMENT_SEED="${TOURNAMENT_SEED:-1}"                   # game i is played with seed TOURNAMENT_SEED + i
+TOURNAMENT_TIMEOUT="${TOURNAMENT_TIMEOUT:-500}"           # ms per move
+
+############################################
+# CLI args (override env/.env)
+############################################
+usage() {
+  cat <<'USAGE'
+Usage:
+  ./scripts/run_board_rules.sh [options]
+
+Without options, starts the board UI and one game in the browser.
+
+Options:
+      --games N             Headless tournament: play N games without the board UI
+      --jobs N              Games played at once (default: one per core)
+      --out DIR             Where game logs and summary.json go (default: tournaments/<timestamp>)
+      --seed N              Seed of the first game
+  -h, --help                Show this help
+USAGE
+}
+
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    -h|--help)
+      usage; exit 0;;
+    --games|--jobs|--out|--seed)
+      [[ $# -ge 2 ]] || { echo "Missing value for $1"; usage; exit 1; }
+      case "$1" in
+        --games) TOURNAMENT_GAMES="$2";;
+        --jobs)  TOURNAMENT_JOBS="$2";;
+        --out)   TOURNAMENT_DIR="$2";;
+        --seed)  TOURNAMENT_SEED="$2";;
+      esac
+      shift 2;;
+    *)
+      echo "Unknown argument: $1"
+      usage; exit 1;;
+  esac
+done
+
+[[ "$TOURNAMENT_GAMES" =~ ^[0-9]+$ ]] || die "--games must be a number"
+[[ "$TOURNAMENT_JOBS" =~ ^[1-9][0-9]*$ ]] || die "--jobs must be a positive number"
+HEADLESS=false
+[[ "$TOURNAMENT_GAMES" -gt 0 ]] && HEADLESS=true
+
 ############################################
 # Sanity checks
 ############################################
-[[ -d "$BOARD_DIR" ]] || die "Missing board dir: $BOARD_DIR (did you run setup?)"
+if ! $HEADLESS; then
+  [[ -d "$BOARD_DIR" ]] || die "Missing board dir: $BOARD_DIR (did you run setup?)"
+fi
 [[ -d "$RULES_DIR" ]] || die "Missing rules dir: $RULES_DIR (did you run setup?)"
 [[ -x "$BS_BIN"    ]] || die "CLI not found/executable at: $BS_BIN"
 
@@ -80,33 +140,35 @@ log "Derived URLs -> ENGINE_URL: ${ENGINE_URL} | BOARD_URL: ${BOARD_URL}"
 ############################################
 # Start Board UI (local dev server)
 ############################################
-pushd "$BOARD_DIR" >/dev/null
+if ! $HEADLESS; then
+  pushd "$BOARD_DIR" >/dev/null
 
-if [[ ! -d node_modules ]]; then
-  log "Installing board dependencies"
-  npm ci || npm install
-fi
+  if [[ ! -d node_modules ]]; then
+    log "Installing board dependencies"
+    npm ci || npm install
+  fi
 
-if npm run -s | grep -qE '^\s*dev\b'; then
-  log "Starting board: npm run dev -- --host ${BOARD_HOST} --port ${BOARD_PORT}"
-  npm run dev -- --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
-elif npm run -s | grep -qE '^\s*preview\b'; then
-  log "Starting board (build + preview)"
-  npm run build
-  npm run preview -- --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
-else
-  log "Starting board via vite fallback"
-  npx vite --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
-fi
-BOARD_PID=$!
-popd >/dev/null
+  if npm run -s | grep -qE '^\s*dev\b'; then
+    log "Starting board: npm run dev -- --host ${BOARD_HOST} --port ${BOARD_PORT}"
+    npm run dev -- --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
+  elif npm run -s | grep -qE '^\s*preview\b'; then
+    log "Starting board (build + preview)"
+    npm run build
+    npm run preview -- --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
+  else
+    log "Starting board via vite fallback"
+    npx vite --host "${BOARD_HOST}" --port "${BOARD_PORT}" >/dev/null 2>&1 &
+  fi
+  BOARD_PID=$!
+  popd >/dev/null
 
-# Wait for board to listen locally
-for _ in $(seq 1 "$WAIT_STEPS"); do
-  if curl -fsS "http://127.0.0.1:${BOARD_PORT}" >/dev/null 2>&1; then break; fi
-  sleep "$WAIT_INTERVAL"
-done
-log "Board listening on :${BOARD_PORT} (PID ${BOARD_PID})"
+  # Wait for board to listen locally
+  for _ in $(seq 1 "$WAIT_STEPS"); do
+    if curl -fsS "http://127.0.0.1:${BOARD_PORT}" >/dev/null 2>&1; then break; fi
+    sleep "$WAIT_INTERVAL"
+  done
+  log "Board listening on :${BOARD_PORT} (PID ${BOARD_PID})"
+fi
 
 ############################################
 # Snake discovery
@@ -184,6 +246,8 @@ PY
   echo "$json" | grep -oE '"name"\s*:\s*"[^"]+"' | head -n1 | sed -E 's/.*"name"\s*:\s*"([^"]+)".*/\1/' || true
 }
 
+mapfile -t CANDIDATE_URLS < <(expand_lineup_urls "${CANDIDATE_URLS[@]}")
+
 # Build confirmed snakes with names
 declare -a SNAKE_NAMES=()
 declare -a SNAKE_URL_ARGS=()
@@ -214,6 +278,102 @@ if [[ "${#SNAKE_URL_ARGS[@]}" -ge 2 && "${GAME_MODE}" == "solo" ]]; then
   GAME_MODE="standard"
 fi
 
+# Build repeated --name/--url pairs
+declare -a SNAKE_ARGS=()
+for i in "${!SNAKE_URL_ARGS[@]}"; do
+  SNAKE_ARGS+=( --name "${SNAKE_NAMES[$i]}" --url "${SNAKE_URL_ARGS[$i]}" )
+done
+
+############################################
+# Headless tournament: N CLI games in parallel
+############################################
+if $HEADLESS; then
+  mkdir -p "$TOURNAMENT_DIR"
+  log "Playing ${TOURNAMENT_GAMES} headless game(s), ${TOURNAMENT_JOBS} at a time → ${TOURNAMENT_DIR}"
+  log "Tip: serve the snakes with SERVER_MODE=production so they answer games in parallel"
+
+  started=$SECONDS
+  for i in $(seq 1 "$TOURNAMENT_GAMES"); do
+    while [[ "$(jobs -pr | wc -l)" -ge "$TOURNAMENT_JOBS" ]]; do
+      wait -n || true
+    done
+    "$BS_BIN" play \
+      -W "${WIDTH}" -H "${HEIGHT}" \
+      -g "${GAME_MODE}" \
+      -t "${TOURNAMENT_TIMEOUT}" \
+      -r "$((TOURNAMENT_SEED + i))" \
+      --output "${TOURNAMENT_DIR}/game-${i}.jsonl" \
+      "${SNAKE_ARGS[@]}" >"${TOURNAMENT_DIR}/game-${i}.log" 2>&1 &
+  done
+  wait || true
+  log "Games finished in $((SECONDS - started))s"
+
+  # One record per game (winner, turns) from the CLI's output, then totals per snake
+  python3 - "$TOURNAMENT_DIR" "$TOURNAMENT_GAMES" "$TOURNAMENT_SEED" "${SNAKE_NAMES[@]}" <<'PY'
+import json, os, re, sys
+
+out_dir, games, seed, names = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4:]
+records = []
+for i in range(1, games + 1):
+    record = {"game": i, "seed": seed + i, "winner": None, "draw": False, "turns": None, "error": None}
+    try:
+        with open(os.path.join(out_dir, f"game-{i}.jsonl")) as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if "isDraw" in data:
+                    record["draw"] = bool(data["isDraw"])
+                    record["winner"] = None if record["draw"] else data.get("winnerName") or None
+                elif isinstance(data.get("turn"), int):
+                    record["turns"] = data["turn"]
+    except OSError:
+        pass
+    # Fall back to the CLI's own log line
+    try:
+        with open(os.path.join(out_dir, f"game-{i}.log")) as f:
+            log = f.read()
+        done = re.search(r"Game completed after (\d+) turns\.(?: (.+) was the winner\.| It was a draw\.)?", log)
+        if done:
+            if record["turns"] is None:
+                record["turns"] = int(done.group(1))
+            if record["winner"] is None and not record["draw"]:
+                record["winner"] = done.group(2)
+                record["draw"] = done.group(2) is None and len(names) > 1
+        elif record["turns"] is None:
+            record["error"] = log.strip().splitlines()[-1] if log.strip() else "no output"
+    except OSError:
+        record["error"] = record["error"] or "no log"
+    records.append(record)
+
+played = [r for r in records if r["error"] is None]
+summary = {
+    "games": games,
+    "completed": len(played),
+    "draws": sum(1 for r in played if r["draw"]),
+    "avg_turns": sum(r["turns"] for r in played) / len(played) if played else 0.0,
+    "snakes": {
+        name: {
+            "wins": sum(1 for r in played if r["winner"] == name),
+            "win_rate": sum(1 for r in played if r["winner"] == name) / len(played) if played else 0.0,
+        }
+        for name in names
+    },
+    "results": records,
+}
+path = os.path.join(out_dir, "summary.json")
+with open(path, "w") as f:
+    json.dump(summary, f, indent=2)
+
+print(f"{summary['completed']}/{games} games completed, {summary['draws']} draws, avg {summary['avg_turns']:.1f} turns")
+for name, s in summary["snakes"].items():
+    print(f"  {name:<32} {s['wins']:>5} wins  {s['win_rate'] * 100:5.1f}%")
+print(f"Summary written to {path}")
+PY
+  exit 0
+fi
+
 ############################################
 # Launch local game (engine) via `play`
 ############################################
@@ -225,12 +385,6 @@ else
   log "CLI does not expose --board-url; relying on --browser to open its default UI"
 fi
 
-# Build repeated --name/--url pairs
-declare -a SNAKE_ARGS=()
-for i in "${!SNAKE_URL_ARGS[@]}"; do
-  SNAKE_ARGS+=( --name "${SNAKE_NAMES[$i]}" --url "${SNAKE_URL_ARGS[$i]}" )
-done
-
 log "Starting local game via CLI 'play' with ${#SNAKE_URL_ARGS[@]} snake(s)…"
 set -x
 "$BS_BIN" play \
@@ -7,6 +7,9 @@ set -euo pipefail
 log()  { printf "\033[1;34m[run]\033[0m %s\n" "$*"; }
 die()  { echo "❌ $*" >&2; exit 1; }
 
+# shellcheck source=lineup.sh
+source "$(dirname "${BASH_SOURCE[0]}")/lineup.sh"
+
 BOARD_PID=""
 CLI_PID=""
 
@@ -231,6 +234,8 @@ PY
   echo "$json" | grep -oE '"name"\s*:\s*"[^"]+"' | head -n1 | sed -E 's/.*"name"\s*:\s*"([^"]+)".*/\1/' || true
 }
 
+mapfile -t CANDIDATE_URLS < <(expand_lineup_urls "${CANDIDATE_URLS[@]}")
+
 declare -a SNAKE_NAMES=()
 declare -a SNAKE_URL_ARGS=()
 for url in "${CANDIDATE_URLS[@]}"; do
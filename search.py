@@ -0,0 +1,252 @@
+# Time-budgeted game-tree search for move selection.
+#
+# Paranoid minimax with alpha-beta pruning over simultaneous moves: at every node we
+# pick our move first and all opponents then answer together with the joint move
+# that is worst for us. Iterative deepening repeats the search one ply deeper until
+# the time budget (a fraction of the game's timeout) runs out, and the answer from
+# the deepest completed depth wins.
+
+import itertools
+import os
+import time
+import typing
+
+import deadline
+from position import Position
+import transposition
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+# Fraction of game.timeout that a search may spend; the rest is left for the network
+TIME_FRACTION = float(os.environ.get("SEARCH_TIME_FRACTION", "0.4"))
+MAX_DEPTH = int(os.environ.get("SEARCH_MAX_DEPTH", "32"))
+
+WIN = 100000
+LOSS = -100000
+INF = float('inf')
+
+class SearchTimeout(Exception):
+    pass
+
+class SearchResult(typing.NamedTuple):
+    move: str
+    score: float
+    depth: int  # deepest fully completed depth
+    nodes: int
+    elapsed_ms: float
+    cache_hits: int = 0
+
+# Static evaluation from snake 0's point of view. Wins and losses are offset by the
+# plies still left to search so that a later loss (or an earlier win) scores better.
+def evaluate(pos: Position, depth: int = 0) -> float:
+    if not pos.alive[0]:
+        return LOSS - depth
+    opponents_alive = pos.alive_count() - 1
+    if opponents_alive == 0 and len(pos.alive) > 1:
+        return WIN + depth
+
+    my_length = pos.length(0)
+    longest_opponent = 0
+    for i in range(1, len(pos.bodies)):
+        if pos.alive[i] and pos.length(i) > longest_opponent:
+            longest_opponent = pos.length(i)
+
+    space = reachable_area(pos, pos.head(0), limit=my_length * 2)
+    score = space * 4.0 + (my_length - longest_opponent) * 10.0 - opponents_alive * 50.0
+    if space < my_length:
+        # Boxed in: we will run into our own tail region before it clears
+        score -= 500.0
+    if pos.health[0] < 20:
+        score -= (20 - pos.health[0]) * 5.0
+    return score
+
+# Number of free cells reachable from `start`, stopping early once `limit` is reached
+def reachable_area(pos: Position, start: int, limit: int) -> int:
+    occupied = pos.occupied
+    neighbours = pos.neighbours
+    seen = {start}
+    frontier = [start]
+    count = 0
+    while frontier and count < limit:
+        nxt_frontier = []
+        for cur in frontier:
+            for nxt in neighbours[cur]:
+                if nxt not in seen and occupied[nxt] == 0:
+                    seen.add(nxt)
+                    nxt_frontier.append(nxt)
+                    count += 1
+        frontier = nxt_frontier
+    return count
+
+class Searcher:
+    def __init__(self, pos: Position, deadline: float, table: typing.Optional[TranspositionTable] = None):
+        self.pos = pos
+        self.deadline = deadline
+        self.nodes = 0
+        self.table = table
+        self.cache_hits = 0
+        self.root_moves: typing.Optional[typing.List[int]] = None  # restricts the root, for split searches
+        if table is not None:
+            self.keys = transposition.keys_for(pos.width, pos.height, len(pos.bodies))
+            self.food_hash = transposition.food_hash(pos, self.keys)
+
+    def _check_time(self):
+        # perf_counter is cheap but not free; only look at the clock every 256 nodes
+        if self.nodes & 255 == 0 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def _opponent_replies(self) -> typing.List[typing.Tuple[int, ...]]:
+        pos = self.pos
+        options = []
+        for i in range(1, len(pos.bodies)):
+            options.append(pos.safe_moves(i) if pos.alive[i] else [0])
+        return list(itertools.product(*options))
+
+    def _make(self, moves: typing.Sequence[int]):
+        record = self.pos.make(moves)
+        if self.table is not None:
+            for idx in record[1]:
+                self.food_hash ^= self.keys.food[idx]
+        return record
+
+    def _unmake(self, record):
+        self.pos.unmake(record)
+        if self.table is not None:
+            for idx in record[1]:
+                self.food_hash ^= self.keys.food[idx]
+
+    # Our candidate moves, with the best move remembered for this position tried first
+    def _ordered_moves(self, first: typing.Optional[int]) -> typing.List[int]:
+        moves = self.pos.safe_moves(0)
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    # Best score for us with `depth` plies left; a ply is one simultaneous move
+    def alphabeta(self, depth: int, alpha: float, beta: float) -> float:
+        self.nodes += 1
+        self._check_time()
+        pos = self.pos
+        if depth == 0 or not pos.alive[0] or (len(pos.alive) > 1 and pos.alive_count() == 1):
+            return evaluate(pos, depth)
+
+        table = self.table
+        tt_move = None
+        if table is not None:
+            key = transposition.snakes_hash(pos, self.keys, self.food_hash)
+            entry = table.probe(key)
+            if entry is not None:
+                self.cache_hits += 1
+                e_depth, e_value, e_flag, tt_move = entry
+                if e_depth >= depth:
+                    if e_flag == EXACT:
+                        return e_value
+                    if e_flag == LOWER and e_value >= beta:
+                        return e_value
+                    if e_flag == UPPER and e_value <= alpha:
+                        return e_value
+
+        alpha_orig = alpha
+        best = -INF
+        best_move = 0
+        for my_move in self._ordered_moves(tt_move):
+            value = self._min_over_replies(my_move, depth, alpha, beta)
+            if value > best:
+                best = value
+                best_move = my_move
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if table is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(key, depth, best, flag, best_move)
+        return best
+
+    def _min_over_replies(self, my_move: int, depth: int, alpha: float, beta: float) -> float:
+        worst = INF
+        for reply in self._opponent_replies():
+            record = self._make((my_move,) + reply)
+            try:
+                value = self.alphabeta(depth - 1, alpha, beta)
+            finally:
+                self._unmake(record)
+            if value < worst:
+                worst = value
+            if worst < beta:
+                beta = worst
+            if alpha >= beta:
+                break
+        return worst
+
+    # Root search at fixed depth; `first` is tried first so the previous depth's best
+    # move seeds the alpha-beta window
+    def root(self, depth: int, first: typing.Optional[int]) -> typing.Tuple[int, float]:
+        moves = self._ordered_moves(first)
+        if self.root_moves is not None:
+            moves = [m for m in moves if m in self.root_moves]
+        best_move = moves[0]
+        alpha = -INF
+        for my_move in moves:
+            value = self._min_over_replies(my_move, depth, alpha, INF)
+            if value > alpha:
+                alpha = value
+                best_move = my_move
+        return best_move, alpha
+
+# Search time for this turn: a fraction of game.timeout, cut down to what is actually
+# left when running under the /move deadline layer
+def time_budget_ms(game_state: typing.Dict, fraction: typing.Optional[float] = None) -> float:
+    timeout = game_state.get('game', {}).get('timeout', 500)
+    budget = timeout * (TIME_FRACTION if fraction is None else fraction)
+    remaining = deadline.remaining_ms()
+    if remaining is not None:
+        # Keep a little back for building and serializing the answer
+        budget = min(budget, remaining * 0.9)
+    return budget
+
+def iterative_deepening(game_state: typing.Dict, budget_ms: typing.Optional[float] = None,
+                        max_depth: int = MAX_DEPTH,
+                        table: typing.Optional[TranspositionTable] = None,
+                        root_moves: typing.Optional[typing.Sequence[str]] = None,
+                        pos: typing.Optional[Position] = None) -> SearchResult:
+    start = time.perf_counter()
+    if budget_ms is None:
+        budget_ms = time_budget_ms(game_state)
+    if pos is None:
+        pos = Position.from_game_state(game_state)
+    if table is not None:
+        table.new_search()
+    searcher = Searcher(pos, start + budget_ms / 1000.0, table)
+
+    candidates = pos.safe_moves(0)
+    if root_moves is not None:
+        candidates = [m for m in candidates if pos.move_name(m) in root_moves] or candidates
+        searcher.root_moves = candidates
+
+    best_move = candidates[0]
+    if table is not None:
+        entry = table.probe(transposition.position_hash(pos, searcher.keys))
+        if entry is not None and entry[3] in candidates:
+            best_move = entry[3]
+    best_score = evaluate(pos)
+    completed = 0
+    for depth in range(1, max_depth + 1):
+        try:
+            best_move, best_score = searcher.root(depth, best_move)
+        except SearchTimeout:
+            break
+        completed = depth
+        if best_score >= WIN or best_score <= LOSS:
+            # Forced result; searching deeper won't change it
+            break
+
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return SearchResult(pos.move_name(best_move), best_score, completed, searcher.nodes, elapsed_ms,
+                        searcher.cache_hits)
@@ -1,46 +1,213 @@
+import atexit
 import logging
 import os
+import time
 import typing
 
+from flask import Blueprint
 from flask import Flask
+from flask import abort
+from flask import g
+from flask import jsonify
 from flask import request
+from flask.json.provider import DefaultJSONProvider
 
+import board
+import deadline
+import gamestate
+import metrics
+import pool
+import profiler
+import recorder
+import sessions
 
-def run_server(handlers: typing.Dict):
-    app = Flask("Battlesnake")
+# "development" runs Flask's built-in server; "production" runs a pre-fork gunicorn
+# server (pip install gunicorn) with the worker settings below
+SERVER_MODE = os.environ.get("SERVER_MODE", "development")
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", str(min(os.cpu_count() or 1, 4))))
+WEB_THREADS = int(os.environ.get("WEB_THREADS", "4"))  # concurrent requests per worker
+WEB_KEEPALIVE = int(os.environ.get("WEB_KEEPALIVE", "30"))  # seconds an idle connection stays open
+WEB_GRACEFUL_TIMEOUT = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "10"))
+# Guard /move with a deadline and a safe fallback answer (see deadline.py); 0 turns it off
+MOVE_DEADLINE = os.environ.get("MOVE_DEADLINE", "1") != "0"
+
+
+# Request and response JSON through gamestate.loads/dumps (orjson when installed)
+class FastJSONProvider(DefaultJSONProvider):
+    def loads(self, s, **kwargs):
+        return gamestate.loads(s)
 
-    @app.get("/")
+    def dumps(self, obj, **kwargs):
+        try:
+            return gamestate.dumps(obj).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+
+# The info/start/move/end routes of one snake, served under `url_prefix`
+def snake_routes(name: str, handlers: typing.Dict, url_prefix: str = "") -> Blueprint:
+    routes = Blueprint(name, __name__, url_prefix=url_prefix or None)
+    move_handler = profiler.profiling(handlers["move"])
+    if MOVE_DEADLINE:
+        move_handler = deadline.with_deadline(move_handler)
+    if recorder.ENABLED:
+        move_handler = recorder.recording(move_handler)
+
+    @routes.get("/", strict_slashes=False)
     def on_info():
         return handlers["info"]()
 
-    @app.post("/start")
+    @routes.post("/start")
     def on_start():
         game_state = request.get_json()
         handlers["start"](game_state)
         return "ok"
 
-    @app.post("/move")
+    @routes.post("/move")
     def on_move():
-        game_state = request.get_json()
-        return handlers["move"](game_state)
+        g.started = time.perf_counter()
+        g.timings = metrics.begin()
+        if url_prefix:
+            metrics.count(f"moves{url_prefix.replace('/', '.')}")
+        with metrics.phase("parse"):
+            game_state = request.get_json()
+            gamestate.bind(game_state)
+        response = move_handler(game_state)
+        with metrics.phase("serialize"):
+            return jsonify(response)
 
-    @app.post("/end")
+    @routes.post("/end")
     def on_end():
         game_state = request.get_json()
         handlers["end"](game_state)
         return "ok"
 
+    return routes
+
+
+# `handlers` is either one snake's {"info", "start", "move", "end"} handler set,
+# served at /, or a registry of named handler sets, each served under /<name>/
+# (see lineup.py); every snake in a registry shares this process's worker pool,
+# lookup tables and metrics
+def create_app(handlers: typing.Dict) -> Flask:
+    app = Flask("Battlesnake")
+    app.json = FastJSONProvider(app)
+    atexit.register(profiler.SAMPLER.flush)
+    if recorder.ENABLED:
+        atexit.register(recorder.close)
+
+    if "move" in handlers:
+        app.register_blueprint(snake_routes("snake", handlers))
+    else:
+        for name, snake_handlers in handlers.items():
+            app.register_blueprint(snake_routes(name, snake_handlers, f"/{name}"))
+
+        # Lets the run scripts find every snake behind one URL
+        @app.get("/")
+        def on_lineup():
+            return {"snakes": list(handlers)}
+
+    # Local-only snapshot of the timing histograms and search counters (see metrics.py),
+    # plus the live game sessions and their transposition tables (see sessions.py)
+    @app.get("/metrics")
+    def on_metrics():
+        if not metrics.ENABLED or request.remote_addr not in ("127.0.0.1", "::1"):
+            abort(404)
+        snapshot = metrics.snapshot()
+        snapshot["sessions"] = sessions.STORE.stats()
+        return snapshot
+
+    # Local-only profiler switch: GET shows its state, POST {"enabled": true, "percent": 10,
+    # "interval_ms": 1, "min_ms": 0, "reset": false} changes it (see profiler.py)
+    @app.route("/profile", methods=["GET", "POST"])
+    def on_profile():
+        if request.remote_addr not in ("127.0.0.1", "::1"):
+            abort(404)
+        if request.method == "POST":
+            settings = request.get_json(silent=True) or {}
+            if settings.get("reset"):
+                profiler.SAMPLER.reset()
+            profiler.SAMPLER.configure(
+                enabled=settings.get("enabled"),
+                percent=settings.get("percent"),
+                interval_ms=settings.get("interval_ms"),
+                min_ms=settings.get("min_ms"),
+            )
+        return profiler.SAMPLER.status()
+
+    # A bound payload must not outlive its request on a reused worker thread
+    @app.teardown_request
+    def release_payload(_error):
+        gamestate.unbind()
+
     @app.after_request
     def identify_server(response):
         response.headers.set(
             "server", "battlesnake/github/starter-snake-python"
         )
+        timings = g.get("timings")
+        if timings is not None and metrics.ENABLED:
+            metrics.count("moves")
+            metrics.record("total", (time.perf_counter() - g.started) * 1000.0)
+            response.headers.set("Server-Timing", metrics.server_timing(dict(timings)))
         return response
 
+    return app
+
+
+# Pre-fork gunicorn server: the handlers are imported once in the master, every web
+# worker gets its own (warm) search pool, and SIGTERM finishes in-flight requests
+# before exiting
+def run_production(app: Flask, host: str, port: int):
+    from gunicorn.app.base import BaseApplication
+
+    def post_worker_init(worker):
+        pool.start()
+
+    def worker_exit(server, worker):
+        pool.stop()
+        recorder.close()
+        profiler.SAMPLER.flush()
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", WEB_WORKERS)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", WEB_THREADS)
+            self.cfg.set("keepalive", WEB_KEEPALIVE)
+            self.cfg.set("graceful_timeout", WEB_GRACEFUL_TIMEOUT)
+            self.cfg.set("preload_app", True)
+            self.cfg.set("loglevel", "warning")
+            self.cfg.set("post_worker_init", post_worker_init)
+            self.cfg.set("worker_exit", worker_exit)
+
+        def load(self):
+            return app
+
+    ProductionServer().run()
+
+
+def run_server(handlers: typing.Dict):
+    app = create_app(handlers)
+
     host = "0.0.0.0"
     port = int(os.environ.get("PORT", "8000"))
 
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(name)s %(message)s")
     logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
+    # Lookup tables for the usual board sizes, built once here and shared by every worker
+    board.warm()
+
+    if SERVER_MODE == "production":
+        print(f"\nRunning Battlesnake at http://{host}:{port} ({WEB_WORKERS} workers x {WEB_THREADS} threads)")
+        run_production(app, host, port)
+        return
+
+    # Start (and warm) the search workers before we accept any request
+    if pool.start():
+        atexit.register(pool.stop)
+
     print(f"\nRunning Battlesnake at http://{host}:{port}")
     app.run(host=host, port=port)
@@ -0,0 +1,137 @@
+# Per-game session store.
+#
+# A session is created on /start, brought up to date on every /move and dropped on
+# /end, so state that only changes a little between turns - the search Position,
+# the transposition table, search trees - carries over instead of being rebuilt
+# from the JSON each turn. Sessions are keyed by game id and our snake's id: two
+# of our snakes can play in the same game, and each searches from its own side.
+# The store is bounded: sessions idle for longer than the TTL are dropped, and
+# past the game cap the least recently used game goes first.
+#
+# The cap counts games, not bytes. A full transposition table takes about 150
+# bytes per entry (some 10 MB at the default SEARCH_TABLE_SIZE), and an MCTS
+# tree kept in the session cache grows up to PONDER_MAX_NODES nodes, so size
+# SESSION_MAX_GAMES for the memory a worker can spare. stats() reports the live
+# tables' fill so that can be checked on /metrics.
+
+import collections
+import os
+import threading
+import time
+import typing
+
+from position import Position
+from transposition import TranspositionTable
+
+MAX_GAMES = int(os.environ.get("SESSION_MAX_GAMES", "64"))
+TTL_S = float(os.environ.get("SESSION_TTL_S", "600"))
+
+SessionKey = typing.Tuple[str, str]  # (game id, our snake's id)
+
+def session_key(game_state: typing.Dict) -> SessionKey:
+    return game_state['game']['id'], game_state['you']['id']
+
+class GameSession:
+    def __init__(self, game_state: typing.Dict):
+        self.key = session_key(game_state)
+        self.turn = game_state.get('turn', 0)
+        self.last_seen = time.monotonic()
+        self.position = Position.from_game_state(game_state)
+        self.table = TranspositionTable()
+        # Free-form per-game cache for engines (e.g. a search tree to reuse next turn)
+        self.cache: typing.Dict[str, typing.Any] = {}
+        self.lock = threading.Lock()
+        self.rebuilds = 0
+
+    # Apply the new turn's payload; only falls back to a full rebuild when the diff
+    # can't be applied
+    def update(self, game_state: typing.Dict):
+        with self.lock:
+            turn = game_state.get('turn', 0)
+            if turn != self.turn:
+                if turn != self.turn + 1 or not self.position.sync(game_state):
+                    self.position = Position.from_game_state(game_state)
+                    self.rebuilds += 1
+                self.turn = turn
+            self.last_seen = time.monotonic()
+
+    # Private copy of the current position, safe to search while the next turn arrives
+    def position_copy(self) -> Position:
+        with self.lock:
+            return self.position.copy()
+
+class SessionStore:
+    def __init__(self, max_games: int = MAX_GAMES, ttl_s: float = TTL_S):
+        self.max_games = max_games
+        self.ttl_s = ttl_s
+        self._sessions: "collections.OrderedDict[SessionKey, GameSession]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.ended = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def start(self, game_state: typing.Dict) -> GameSession:
+        session = GameSession(game_state)
+        with self._lock:
+            self._sessions[session.key] = session
+            self.created += 1
+            self._trim()
+        return session
+
+    # Session for this /move, created on the fly if /start was missed or it was evicted
+    def touch(self, game_state: typing.Dict) -> GameSession:
+        key = session_key(game_state)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+        if session is None:
+            return self.start(game_state)
+        session.update(game_state)
+        return session
+
+    def get(self, key: SessionKey) -> typing.Optional[GameSession]:
+        with self._lock:
+            return self._sessions.get(key)
+
+    def end(self, key: SessionKey):
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self.ended += 1
+
+    def _trim(self):
+        now = time.monotonic()
+        for key in [k for k, s in self._sessions.items() if now - s.last_seen > self.ttl_s]:
+            del self._sessions[key]
+            self.expired += 1
+        while len(self._sessions) > self.max_games:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def live_games(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        with self._lock:
+            self._trim()
+            live = list(self._sessions.values())
+            stats = {
+                "live_games": len(live),
+                "created": self.created,
+                "ended": self.ended,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "rebuilds": sum(s.rebuilds for s in live),
+            }
+        # Transposition table counters summed over the live games
+        table: typing.Dict[str, float] = {}
+        for session in live:
+            for name, value in session.table.stats().items():
+                table[name] = table.get(name, 0) + value
+        probes = table.get("probes", 0)
+        table["hit_rate"] = table.get("hits", 0) / probes if probes else 0.0
+        stats["transposition"] = table
+        return stats
+
+STORE = SessionStore()
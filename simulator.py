@@ -0,0 +1,341 @@
+# Headless game simulator and batch match runner.
+#
+# Plays whole games in-process by calling each snake's start/move/end functions
+# directly - no CLI, no board UI, no HTTP - using the same rules code as the search engines
+# (position.py) plus the parts only a referee needs: spawn layout, food spawning
+# and the royale hazard border. Games are spread over worker processes and the
+# results are summarised as win rate, average final length and turns survived.
+#
+# Usage:
+#   python simulator.py --snakes main hungry dodge circle --games 1000
+#   python simulator.py --snakes main --mode solo --width 7 --height 7 --games 200
+#   python simulator.py --snakes main dodge --mode royale --json results.json
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import random
+import time
+import typing
+
+from board import MOVES
+from position import Position
+
+# Short names for the bundled snakes; any importable module with info/start/move/end works too
+SNAKES = {
+    "main": "main",
+    "hungry": "examples.hungry",
+    "dodge": "examples.dodge",
+    "circle": "examples.circle",
+}
+
+MODES = ("solo", "standard", "royale")
+START_LENGTH = 3
+MINIMUM_FOOD = 1
+FOOD_SPAWN_CHANCE = 0.15
+HAZARD_DAMAGE = 14
+SHRINK_EVERY_N_TURNS = 25
+MAX_TURNS = 1000
+
+class GameConfig(typing.NamedTuple):
+    snakes: typing.Tuple[str, ...]
+    mode: str = "standard"
+    width: int = 11
+    height: int = 11
+    max_turns: int = MAX_TURNS
+    timeout: int = 500
+
+class GameResult(typing.NamedTuple):
+    seed: int
+    winner: typing.Optional[str]  # None for draws and solo games
+    turns: int
+    lengths: typing.Dict[str, int]  # length when eliminated, or at the end
+    survived: typing.Dict[str, int]  # turns survived
+
+Handlers = typing.Dict[str, typing.Callable]  # {"info", "start", "move", "end"}
+
+_handlers: typing.Dict[str, Handlers] = {}
+
+def handlers_for(snake: str) -> Handlers:
+    module = importlib.import_module(SNAKES.get(snake, snake))
+    return {"info": module.info, "start": module.start, "move": module.move, "end": module.end}
+
+def load_handlers(snake: str) -> Handlers:
+    handlers = _handlers.get(snake)
+    if handlers is None:
+        handlers = _handlers[snake] = handlers_for(snake)
+    return handlers
+
+# Play `handlers` under `name`, e.g. a snake with non-default settings (see tune.py)
+def register(name: str, handlers: Handlers):
+    _handlers[name] = handlers
+
+# Display names, numbered when the same snake plays more than once
+def snake_names(snakes: typing.Sequence[str]) -> typing.List[str]:
+    names = []
+    for i, snake in enumerate(snakes):
+        names.append(f"{snake}#{snakes[:i].count(snake) + 1}" if snakes.count(snake) > 1 else snake)
+    return names
+
+# Standard spawn points on odd-sized boards (corners, then edge midpoints), random cells otherwise
+def spawn_points(rng: random.Random, width: int, height: int, count: int) -> typing.List[typing.Tuple[int, int]]:
+    if width == height and width % 2 == 1 and width >= 7 and count <= 8:
+        low, mid, high = 1, (width - 1) // 2, width - 2
+        corners = [(low, low), (low, high), (high, low), (high, high)]
+        edges = [(low, mid), (mid, low), (high, mid), (mid, high)]
+        rng.shuffle(corners)
+        rng.shuffle(edges)
+        return (corners + edges)[:count]
+    cells = [(x, y) for x in range(width) for y in range(height)]
+    return rng.sample(cells, count)
+
+def initial_state(config: GameConfig, names: typing.List[str], rng: random.Random) -> typing.Dict:
+    width, height = config.width, config.height
+    snakes = []
+    for i, (x, y) in enumerate(spawn_points(rng, width, height, len(names))):
+        body = [{"x": x, "y": y}] * START_LENGTH
+        snakes.append({"id": f"s{i}", "name": names[i], "health": 100, "body": body,
+                       "head": body[0], "length": START_LENGTH})
+
+    # One food diagonal to each snake, away from the centre, plus one in the centre
+    taken = {(s["head"]["x"], s["head"]["y"]) for s in snakes}
+    cx, cy = (width - 1) / 2, (height - 1) / 2
+    food = []
+    for snake in snakes:
+        x, y = snake["head"]["x"], snake["head"]["y"]
+        options = [
+            (x + dx, y + dy) for dx in (-1, 1) for dy in (-1, 1)
+            if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in taken
+            and abs(x + dx - cx) + abs(y + dy - cy) >= abs(x - cx) + abs(y - cy)
+        ]
+        if options:
+            cell = rng.choice(options)
+            taken.add(cell)
+            food.append({"x": cell[0], "y": cell[1]})
+    centre = (width // 2, height // 2)
+    if centre not in taken:
+        food.append({"x": centre[0], "y": centre[1]})
+
+    return {
+        "game": {
+            "id": f"sim-{rng.getrandbits(32):08x}",
+            "ruleset": {"name": config.mode, "version": "sim",
+                        "settings": {"hazardDamagePerTurn": HAZARD_DAMAGE}},
+            "map": "standard",
+            "timeout": config.timeout,
+            "source": "simulator",
+        },
+        "turn": 0,
+        "board": {"width": width, "height": height, "food": food, "hazards": [], "snakes": snakes},
+        "you": snakes[0],
+    }
+
+# The payload snake `you` would receive for the current position; an eliminated
+# `you` (at /end) gets its last body, but is left off the board
+def payload(pos: Position, names: typing.List[str], game: typing.Dict, turn: int, you: int,
+            hazards: typing.List[typing.Dict[str, int]]) -> typing.Dict:
+    width = pos.width
+    snakes = []
+    you_snake = None
+    for i, body in enumerate(pos.bodies):
+        if not pos.alive[i]:
+            continue
+        segments = [{"x": idx % width, "y": idx // width} for idx in body]
+        snake = {"id": pos.ids[i], "name": names[int(pos.ids[i][1:])], "health": pos.health[i],
+                 "body": segments, "head": segments[0], "length": len(segments),
+                 "latency": "0", "shout": ""}
+        snakes.append(snake)
+        if i == you:
+            you_snake = snake
+    if you_snake is None:
+        segments = [{"x": idx % width, "y": idx // width} for idx in pos.bodies[you]]
+        you_snake = {"id": pos.ids[you], "name": names[int(pos.ids[you][1:])], "health": pos.health[you],
+                     "body": segments, "head": segments[0], "length": len(segments),
+                     "latency": "0", "shout": ""}
+    food = [{"x": idx % width, "y": idx // width} for idx, has_food in enumerate(pos.food) if has_food]
+    return {
+        "game": game,
+        "turn": turn,
+        "board": {"width": width, "height": pos.height, "food": food, "hazards": hazards, "snakes": snakes},
+        "you": you_snake,
+    }
+
+def spawn_food(pos: Position, rng: random.Random):
+    count = sum(pos.food)
+    if count >= MINIMUM_FOOD and rng.random() >= FOOD_SPAWN_CHANCE:
+        return
+    free = [idx for idx in range(len(pos.food)) if not pos.food[idx] and not pos.occupied[idx]]
+    for _ in range(max(MINIMUM_FOOD - count, 1)):
+        if not free:
+            return
+        idx = free.pop(rng.randrange(len(free)))
+        pos.food[idx] = 1
+
+# Safe zone for royale, as [min_x, max_x, min_y, max_y]; one side moves in per shrink
+def shrink(bounds: typing.List[int], rng: random.Random):
+    side = rng.randrange(4)
+    if bounds[0] < bounds[1]:
+        if side == 0:
+            bounds[0] += 1
+        elif side == 1:
+            bounds[1] -= 1
+    if bounds[2] < bounds[3]:
+        if side == 2:
+            bounds[2] += 1
+        elif side == 3:
+            bounds[3] -= 1
+
+def hazard_cells(bounds: typing.List[int], width: int, height: int) -> typing.List[typing.Dict[str, int]]:
+    return [
+        {"x": x, "y": y} for y in range(height) for x in range(width)
+        if not (bounds[0] <= x <= bounds[1] and bounds[2] <= y <= bounds[3])
+    ]
+
+# A snake's answer, with its prints swallowed; None if it raised
+def _call(handler: typing.Callable, state: typing.Dict) -> typing.Any:
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return handler(state)
+    except Exception:
+        return None
+
+# Every snake gets /start before turn 0 and /end when the game is over (eliminated
+# ones included), so per-game state such as main's sessions is released.
+# `observer`, if given, sees every /move payload sent during the game
+def play_game(config: GameConfig, seed: int,
+              observer: typing.Optional[typing.Callable[[typing.Dict], None]] = None) -> GameResult:
+    rng = random.Random(seed)
+    random.seed(seed)  # the snakes' own random choices
+    names = snake_names(config.snakes)
+    handlers = [load_handlers(snake) for snake in config.snakes]
+    state = initial_state(config, names, rng)
+    pos = Position.from_game_state(state)
+    game = state["game"]
+    width, height = config.width, config.height
+
+    hazards: typing.List[typing.Dict[str, int]] = []
+    bounds = [0, width - 1, 0, height - 1]
+    last_moves = [0] * len(names)
+    survived = {name: 0 for name in names}
+    lengths = {name: START_LENGTH for name in names}
+    solo = config.mode == "solo"
+
+    for i, snake_handlers in enumerate(handlers):
+        _call(snake_handlers["start"], payload(pos, names, game, 0, i, hazards))
+
+    turn = 0
+    while turn < config.max_turns:
+        alive = pos.alive_count()
+        if alive == 0 or (not solo and alive <= 1):
+            break
+
+        moves = []
+        for i, snake_handlers in enumerate(handlers):
+            if not pos.alive[i]:
+                moves.append(0)
+                continue
+            state = payload(pos, names, game, turn, i, hazards)
+            if observer is not None:
+                observer(state)
+            answer = _call(snake_handlers["move"], state)
+            # An answer we can't use counts like a timeout: the last move is repeated
+            if isinstance(answer, dict) and answer.get("move") in MOVES:
+                last_moves[i] = MOVES.index(answer["move"])
+            moves.append(last_moves[i])
+
+        pos.make(moves)
+        turn += 1
+        for i, name in enumerate(names):
+            if pos.alive[i]:
+                survived[name] = turn
+                lengths[name] = len(pos.bodies[i])
+
+        spawn_food(pos, rng)
+        if config.mode == "royale" and turn % SHRINK_EVERY_N_TURNS == 0:
+            shrink(bounds, rng)
+            hazards = hazard_cells(bounds, width, height)
+            pos.hazards = bytearray(width * height)
+            for cell in hazards:
+                pos.hazards[cell["y"] * width + cell["x"]] = 1
+
+    for i, snake_handlers in enumerate(handlers):
+        _call(snake_handlers["end"], payload(pos, names, game, turn, i, hazards))
+
+    winner = None
+    if not solo:
+        alive = [names[i] for i in range(len(names)) if pos.alive[i]]
+        if len(alive) == 1:
+            winner = alive[0]
+    return GameResult(seed, winner, turn, lengths, survived)
+
+def _play(args: typing.Tuple[GameConfig, int]) -> GameResult:
+    return play_game(*args)
+
+def run_batch(config: GameConfig, games: int, seed: int = 0, workers: typing.Optional[int] = None) -> typing.List[GameResult]:
+    jobs = [(config, seed + i) for i in range(games)]
+    workers = workers or multiprocessing.cpu_count()
+    if workers <= 1:
+        return [_play(job) for job in jobs]
+    with multiprocessing.Pool(workers) as pool:
+        return list(pool.imap_unordered(_play, jobs, chunksize=max(games // (workers * 8), 1)))
+
+def summarise(config: GameConfig, results: typing.List[GameResult]) -> typing.Dict[str, typing.Any]:
+    names = snake_names(config.snakes)
+    games = len(results)
+    snakes = {}
+    for name in names:
+        wins = sum(1 for r in results if r.winner == name)
+        snakes[name] = {
+            "wins": wins,
+            "win_rate": wins / games if games else 0.0,
+            "avg_length": sum(r.lengths[name] for r in results) / games if games else 0.0,
+            "avg_turns_survived": sum(r.survived[name] for r in results) / games if games else 0.0,
+        }
+    return {
+        "mode": config.mode,
+        "board": f"{config.width}x{config.height}",
+        "games": games,
+        "draws": sum(1 for r in results if r.winner is None) if config.mode != "solo" else 0,
+        "avg_turns": sum(r.turns for r in results) / games if games else 0.0,
+        "snakes": snakes,
+    }
+
+def print_summary(summary: typing.Dict[str, typing.Any], elapsed: float):
+    print(f"{summary['games']} {summary['mode']} games on {summary['board']} in {elapsed:.1f}s "
+          f"({summary['games'] / elapsed if elapsed else 0:.1f} games/s), "
+          f"avg {summary['avg_turns']:.1f} turns, {summary['draws']} draws")
+    print(f"{'snake':<16} {'wins':>6} {'win %':>7} {'avg len':>8} {'avg turns':>10}")
+    for name, s in summary["snakes"].items():
+        print(f"{name:<16} {s['wins']:>6} {s['win_rate'] * 100:>6.1f}% {s['avg_length']:>8.1f} {s['avg_turns_survived']:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Battlesnake games headless, in-process.")
+    parser.add_argument("--snakes", nargs="+", default=["main", "hungry", "dodge", "circle"],
+                        help=f"snakes to play: {', '.join(SNAKES)} or an importable module with info/start/move/end")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--mode", choices=MODES, default=None, help="default: solo for one snake, else standard")
+    parser.add_argument("--width", type=int, default=11)
+    parser.add_argument("--height", type=int, default=11)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    mode = args.mode or ("solo" if len(args.snakes) == 1 else "standard")
+    config = GameConfig(tuple(args.snakes), mode, args.width, args.height, args.max_turns)
+    started = time.perf_counter()
+    results = run_batch(config, args.games, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+
+    summary = summarise(config, results)
+    print_summary(summary, elapsed)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import typing
+
+import pytest
+
+# The modules live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Minimal /move payload: snakes maps an id to its body, head first; the first snake is `you`
+def build_game_state(snakes: typing.Dict[str, typing.List[typing.Tuple[int, int]]], food=(), hazards=(),
+                      width: int = 7, height: int = 7, health: int = 90) -> typing.Dict:
+    payload_snakes = []
+    for snake_id, body in snakes.items():
+        segments = [{"x": x, "y": y} for x, y in body]
+        payload_snakes.append({"id": snake_id, "health": health, "body": segments,
+                               "head": segments[0], "length": len(segments)})
+    return {
+        "game": {"id": "test", "ruleset": {"name": "standard", "settings": {"hazardDamagePerTurn": 14}}},
+        "turn": 1,
+        "board": {
+            "width": width,
+            "height": height,
+            "food": [{"x": x, "y": y} for x, y in food],
+            "hazards": [{"x": x, "y": y} for x, y in hazards],
+            "snakes": payload_snakes,
+        },
+        "you": payload_snakes[0],
+    }
+
+
+@pytest.fixture
+def game_state():
+    return build_game_state
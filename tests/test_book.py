@@ -0,0 +1,52 @@
+import book
+import gamestate
+from board import DELTAS, MOVES
+
+
+def step(x: int, y: int, move: int):
+    dx, dy = DELTAS[move]
+    return x + dx, y + dy
+
+
+def test_symmetries_map_moves_with_cells():
+    for width, height in ((7, 7), (11, 11), (7, 11)):
+        for cells, moves in book.symmetries(width, height):
+            for x in range(1, width - 1):
+                for y in range(1, height - 1):
+                    head = cells[y * width + x]
+                    for move in range(len(MOVES)):
+                        nx, ny = step(x, y, move)
+                        mapped = step(head % width, head // width, moves[move])
+                        assert cells[ny * width + nx] == mapped[1] * width + mapped[0]
+
+
+def test_symmetries_count():
+    assert len(book.symmetries(11, 11)) == 8
+    assert len(book.symmetries(7, 11)) == 4
+
+
+def test_lookup_maps_the_move_for_a_mirrored_position(tmp_path, game_state):
+    bodies = {"you": [(1, 2), (1, 1), (1, 0)], "them": [(5, 5), (5, 6), (4, 6)]}
+    food = [(3, 2)]
+    state = game_state(bodies, food)
+    key, moves = book.canonical(gamestate.from_dict(state))
+    path = str(tmp_path / "book.bin")
+    book.write_book(path, {key: moves[MOVES.index("right")]})
+    table = book.Book(path)
+
+    assert table.lookup(state) == "right"
+    flipped = game_state({name: [(6 - x, y) for x, y in body] for name, body in bodies.items()},
+                         [(6 - x, y) for x, y in food])
+    assert table.lookup(flipped) == "left"
+
+
+def test_lookup_skips_other_rulesets(tmp_path, game_state):
+    state = game_state({"you": [(1, 2), (1, 1), (1, 0)], "them": [(5, 5), (5, 6), (4, 6)]})
+    key, moves = book.canonical(gamestate.from_dict(state))
+    path = str(tmp_path / "book.bin")
+    book.write_book(path, {key: moves[MOVES.index("up")]})
+    table = book.Book(path)
+
+    assert table.lookup(state) == "up"
+    state["game"]["ruleset"]["name"] = "wrapped"
+    assert table.lookup(state) is None
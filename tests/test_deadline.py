@@ -0,0 +1,28 @@
+import deadline
+
+
+def test_short_timeout_still_runs_the_handler(game_state):
+    state = game_state({"you": [(3, 3), (3, 2), (3, 1)]})
+    state["game"]["timeout"] = 80  # below the network margin
+    seen = []
+
+    def handler(payload):
+        seen.append(deadline.remaining_ms())
+        return {"move": "left"}
+
+    assert deadline.fallback_move(state) != "left"
+    assert deadline.with_deadline(handler)(state) == {"move": "left"}
+    assert seen and 0 < seen[0] <= 40
+
+
+def test_budget_keeps_the_network_margin(game_state):
+    state = game_state({"you": [(3, 3), (3, 2), (3, 1)]})
+    state["game"]["timeout"] = 500
+    seen = []
+
+    def handler(payload):
+        seen.append(deadline.remaining_ms())
+        return {"move": "left"}
+
+    deadline.with_deadline(handler)(state)
+    assert 350 < seen[0] <= 500 - deadline.NETWORK_MARGIN_MS
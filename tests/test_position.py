@@ -0,0 +1,155 @@
+import random
+import typing
+
+import simulator
+from benchmarks.boards import make_game_state
+from board import MOVES
+from position import MAX_HEALTH, Position
+
+UP, DOWN, RIGHT, LEFT = (MOVES.index(m) for m in ("up", "down", "right", "left"))
+
+
+def snapshot(pos: Position):
+    return ([list(body) for body in pos.bodies], list(pos.health), list(pos.alive),
+            bytes(pos.occupied), bytes(pos.food))
+
+
+def test_make_unmake_round_trip():
+    rng = random.Random(0)
+    for seed in range(20):
+        pos = Position.from_game_state(make_game_state(width=11, height=11, snakes=4, food=10, seed=seed))
+        before = snapshot(pos)
+        records = []
+        for _ in range(30):
+            if pos.alive_count() == 0:
+                break
+            records.append(pos.make([rng.choice(pos.safe_moves(i)) for i in range(len(pos.bodies))]))
+        for record in reversed(records):
+            pos.unmake(record)
+        assert snapshot(pos) == before
+
+
+def test_head_to_head_equal_length_both_lose(game_state):
+    pos = Position.from_game_state(game_state({
+        "a": [(1, 3), (0, 3), (0, 2)],
+        "b": [(3, 3), (4, 3), (4, 2)],
+    }))
+    pos.make([RIGHT, LEFT])
+    assert pos.alive == [False, False]
+
+
+def test_head_to_head_longer_snake_wins(game_state):
+    pos = Position.from_game_state(game_state({
+        "a": [(1, 3), (0, 3), (0, 2), (0, 1)],
+        "b": [(3, 3), (4, 3), (4, 2)],
+    }))
+    record = pos.make([RIGHT, LEFT])
+    assert pos.alive == [True, False]
+    assert pos.occupied[pos.head(0)] == 1
+    pos.unmake(record)
+    assert pos.alive == [True, True]
+
+
+def test_running_into_a_body_loses(game_state):
+    pos = Position.from_game_state(game_state({
+        "a": [(1, 3), (0, 3), (0, 2)],
+        "b": [(2, 4), (2, 3), (2, 2), (2, 1)],
+    }))
+    pos.make([RIGHT, UP])
+    assert pos.alive == [False, True]
+
+
+def test_eating_stacks_the_tail(game_state):
+    pos = Position.from_game_state(game_state({"a": [(1, 1), (1, 0), (0, 0)]}, food=[(1, 2)]))
+    pos.make([UP])
+    body = list(pos.bodies[0])
+    assert len(body) == 4
+    assert body[-1] == body[-2]
+    assert pos.occupied[body[-1]] == 2
+    assert pos.health[0] == MAX_HEALTH
+    assert not any(pos.food)
+
+    # The stacked tail stays put for a turn, so moving onto it is not safe
+    tail = body[-1]
+    assert pos.occupied[tail] == 2
+    pos.make([UP])
+    assert pos.occupied[tail] == 1 and list(pos.bodies[0])[-1] == tail
+
+
+def test_moving_into_a_stacked_tail_loses(game_state):
+    # b just ate, so its tail cell (2, 1) is still there next turn
+    pos = Position.from_game_state(game_state({
+        "a": [(1, 1), (0, 1), (0, 0)],
+        "b": [(2, 3), (2, 2), (2, 1), (2, 1)],
+    }))
+    assert RIGHT not in pos.safe_moves(0)
+    pos.make([RIGHT, UP])
+    assert pos.alive == [False, True]
+
+
+def test_moving_into_a_plain_tail_is_safe(game_state):
+    pos = Position.from_game_state(game_state({
+        "a": [(1, 1), (0, 1), (0, 0)],
+        "b": [(2, 3), (2, 2), (2, 1)],
+    }))
+    assert RIGHT in pos.safe_moves(0)
+    pos.make([RIGHT, UP])
+    assert pos.alive == [True, True]
+
+
+def test_hazard_damage(game_state):
+    pos = Position.from_game_state(game_state({"a": [(1, 1), (1, 0), (0, 0)]}, hazards=[(1, 2), (1, 3), (1, 3)]))
+    pos.make([UP])
+    assert pos.health[0] == 90 - 1 - 14
+    # Stacked hazards hurt once per layer
+    pos.make([UP])
+    assert pos.health[0] == 90 - 1 - 14 - 1 - 2 * 14
+
+
+def test_hazard_damage_can_eliminate(game_state):
+    pos = Position.from_game_state(game_state({"a": [(1, 1), (1, 0), (0, 0)]}, hazards=[(1, 2)], health=10))
+    record = pos.make([UP])
+    assert pos.alive == [False]
+    assert not any(pos.occupied)
+    pos.unmake(record)
+    assert pos.alive == [True] and pos.health == [10]
+
+
+def test_food_under_hazard_restores_health(game_state):
+    pos = Position.from_game_state(game_state({"a": [(1, 1), (1, 0), (0, 0)]}, food=[(1, 2)], hazards=[(1, 2)]))
+    pos.make([UP])
+    assert pos.health[0] == MAX_HEALTH
+
+
+def test_sync_matches_a_fresh_position():
+    for seed in range(4):
+        payloads = []
+        config = simulator.GameConfig(("main", "hungry", "dodge", "circle"), "royale", 11, 11, max_turns=120)
+
+        # Every turn as seen by the first snake, while it is alive
+        def observe(state: typing.Dict):
+            if not payloads or state["you"]["id"] == payloads[0]["you"]["id"]:
+                payloads.append(state)
+
+        simulator.play_game(config, seed, observe)
+        assert len(payloads) > 2
+
+        synced = Position.from_game_state(payloads[0])
+        for payload in payloads[1:]:
+            assert synced.sync(payload)
+            fresh = Position.from_game_state(payload)
+            alive = {synced.ids[i]: i for i in range(len(synced.ids)) if synced.alive[i]}
+            assert sorted(alive) == sorted(fresh.ids)
+            for j, snake_id in enumerate(fresh.ids):
+                i = alive[snake_id]
+                assert list(synced.bodies[i]) == list(fresh.bodies[j])
+                assert synced.health[i] == fresh.health[j]
+            assert synced.occupied == fresh.occupied
+            assert synced.food == fresh.food
+            assert synced.hazards == fresh.hazards
+
+
+def test_sync_rejects_a_different_board(game_state):
+    pos = Position.from_game_state(game_state({"a": [(1, 1), (1, 0), (0, 0)]}))
+    assert not pos.sync(game_state({"a": [(1, 1), (1, 0), (0, 0)]}, width=9, height=9))
+    assert not pos.sync(game_state({"a": [(1, 1), (1, 0), (0, 0)], "new": [(5, 5), (5, 4), (5, 3)]}))
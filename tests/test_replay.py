@@ -0,0 +1,25 @@
+import random
+
+import recorder
+import replay
+
+
+def coin_flip(game_state):
+    return {"move": random.choice(["up", "down", "left", "right"])}
+
+
+def test_replay_restores_the_recorded_seed(tmp_path, monkeypatch, game_state):
+    path = str(tmp_path / "moves.jsonl.gz")
+    monkeypatch.setattr(recorder, "_recorder", recorder.Recorder("", path=path))
+    recorded = recorder.recording(coin_flip)
+    for turn in range(40):
+        state = game_state({"you": [(3, 3), (3, 2), (3, 1)]})
+        state["turn"] = turn
+        recorded(state)
+    recorder.close()
+
+    records = list(recorder.read_records(path))
+    assert len(records) == 40 and all("seed" in r for r in records)
+    result = replay.replay(path, coin_flip)
+    assert result.turns == 40
+    assert result.changed == []
@@ -0,0 +1,33 @@
+import main
+import sessions
+
+
+def test_snakes_in_one_game_get_their_own_sessions(game_state):
+    bodies = {"a": [(1, 1), (1, 0), (0, 0)], "b": [(5, 5), (5, 6), (4, 6)]}
+    as_a = game_state(bodies)
+    as_b = game_state(dict(reversed(list(bodies.items()))))
+    store = sessions.SessionStore()
+
+    store.start(as_a)
+    store.start(as_b)
+    assert store.live_games() == 2
+    assert store.touch(as_a).position.ids[0] == "a"
+    assert store.touch(as_b).position.ids[0] == "b"
+
+    store.end(sessions.session_key(as_a))
+    assert store.get(sessions.session_key(as_a)) is None
+    assert store.get(sessions.session_key(as_b)).position.ids[0] == "b"
+
+
+def test_end_drops_only_its_own_session(game_state, monkeypatch):
+    store = sessions.SessionStore()
+    monkeypatch.setattr(sessions, "STORE", store)
+    monkeypatch.setattr(main, "MOVE_POLICY", "minimax")
+    bodies = {"a": [(1, 1), (1, 0), (0, 0)], "b": [(5, 5), (5, 6), (4, 6)]}
+    as_a, as_b = game_state(bodies), game_state(dict(reversed(list(bodies.items()))))
+
+    main.start(as_a)
+    main.start(as_b)
+    main.end(as_a)
+    assert store.get(sessions.session_key(as_a)) is None
+    assert store.get(sessions.session_key(as_b)) is not None
@@ -0,0 +1,36 @@
+import main
+import sessions
+import simulator
+
+
+def recording_handlers(calls, name):
+    return {
+        "info": lambda: {},
+        "start": lambda state: calls.append(("start", name, state["you"]["id"])),
+        # Straight up: the snakes spawn apart, and the upper one hits the wall first
+        "move": lambda state: {"move": "up"},
+        "end": lambda state: calls.append(("end", name, state["you"]["id"])),
+    }
+
+
+def test_every_snake_gets_start_and_end():
+    calls = []
+    simulator.register("rec-a", recording_handlers(calls, "rec-a"))
+    simulator.register("rec-b", recording_handlers(calls, "rec-b"))
+    config = simulator.GameConfig(("rec-a", "rec-b"), "standard", 7, 7, max_turns=50)
+    result = simulator.play_game(config, 0)
+
+    assert calls[:2] == [("start", "rec-a", "s0"), ("start", "rec-b", "s1")]
+    assert calls[2:] == [("end", "rec-a", "s0"), ("end", "rec-b", "s1")]
+    assert result.turns < 50  # someone was eliminated before the end
+
+
+def test_games_release_main_sessions(monkeypatch):
+    store = sessions.SessionStore()
+    monkeypatch.setattr(sessions, "STORE", store)
+    monkeypatch.setattr(main, "MOVE_POLICY", "minimax")
+    config = simulator.GameConfig(("main", "main"), "standard", 7, 7, max_turns=1, timeout=100)
+    simulator.play_game(config, 0)
+
+    assert store.created == 2
+    assert store.live_games() == 0
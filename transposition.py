@@ -0,0 +1,115 @@
+# Zobrist hashing and a bounded transposition table for the move search.
+#
+# Keys cover every live snake's head, body, length and health bucket plus the
+# food on the board, per board size and snake slot. Keys come from a fixed seed,
+# so the same position hashes the same on every turn and in every process, and a
+# table kept for the whole game lets a search reuse the previous turn's subtrees.
+
+import functools
+import os
+import random
+import typing
+
+from position import Position
+
+TABLE_SIZE = int(os.environ.get("SEARCH_TABLE_SIZE", str(1 << 16)))
+HEALTH_BUCKET = 10  # health values that hash the same: 0-9, 10-19, ...
+
+EXACT = 0
+LOWER = 1  # value is a lower bound (search failed high)
+UPPER = 2  # value is an upper bound (search failed low)
+
+class ZobristKeys:
+    __slots__ = ("head", "body", "length", "health", "food")
+
+    def __init__(self, cells: int, snakes: int, seed: int = 0x5EED):
+        rng = random.Random(seed)
+        bits = rng.getrandbits
+        self.head = [[bits(64) for _ in range(cells)] for _ in range(snakes)]
+        self.body = [[bits(64) for _ in range(cells)] for _ in range(snakes)]
+        self.length = [[bits(64) for _ in range(cells + 1)] for _ in range(snakes)]
+        self.health = [[bits(64) for _ in range(100 // HEALTH_BUCKET + 1)] for _ in range(snakes)]
+        self.food = [bits(64) for _ in range(cells)]
+
+@functools.lru_cache(maxsize=None)
+def keys_for(width: int, height: int, snakes: int) -> ZobristKeys:
+    return ZobristKeys(width * height, snakes)
+
+# Hash of the food on the board; searches keep this up to date from make/unmake records
+def food_hash(pos: Position, keys: ZobristKeys) -> int:
+    h = 0
+    food_keys = keys.food
+    for idx, has_food in enumerate(pos.food):
+        if has_food:
+            h ^= food_keys[idx]
+    return h
+
+# Hash of the snakes, combined with an already known food hash
+def snakes_hash(pos: Position, keys: ZobristKeys, h: int = 0) -> int:
+    for i, body in enumerate(pos.bodies):
+        if not pos.alive[i]:
+            continue
+        body_keys = keys.body[i]
+        h ^= keys.head[i][body[0]]
+        for idx in body:
+            h ^= body_keys[idx]
+        h ^= keys.length[i][len(body)]
+        h ^= keys.health[i][max(pos.health[i], 0) // HEALTH_BUCKET]
+    return h
+
+def position_hash(pos: Position, keys: ZobristKeys) -> int:
+    return snakes_hash(pos, keys, food_hash(pos, keys))
+
+# Fixed-size table indexed by the low bits of the hash. A slot is replaced when the
+# new result is searched at least as deep, or when the stored one is from an older
+# search (an earlier turn), so deep results survive until they go stale.
+class TranspositionTable:
+    def __init__(self, size: int = TABLE_SIZE):
+        # Round down to a power of two so the slot is a cheap mask
+        self.size = 1 << (max(size, 1).bit_length() - 1)
+        self.mask = self.size - 1
+        self.entries: typing.List[typing.Optional[tuple]] = [None] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.filled = 0  # slots in use
+
+    def new_search(self):
+        self.generation += 1
+
+    # Returns (depth, value, flag, move) for a stored position, or None
+    def probe(self, key: int) -> typing.Optional[typing.Tuple[int, float, int, int]]:
+        self.probes += 1
+        entry = self.entries[key & self.mask]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1], entry[2], entry[3], entry[4]
+
+    def store(self, key: int, depth: int, value: float, flag: int, move: int):
+        slot = key & self.mask
+        entry = self.entries[slot]
+        if entry is not None:
+            if entry[0] != key:
+                if entry[1] > depth and entry[5] == self.generation:
+                    return
+                self.evictions += 1
+            elif entry[1] > depth and entry[5] == self.generation:
+                return
+        else:
+            self.filled += 1
+        self.entries[slot] = (key, depth, value, flag, move, self.generation)
+        self.stores += 1
+
+    def stats(self) -> typing.Dict[str, float]:
+        return {
+            "size": self.size,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "filled": self.filled,
+        }
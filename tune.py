@@ -0,0 +1,224 @@
+# Heuristic weight tuning by self-play.
+#
+# Exposes a snake's hand-set constants as a parameter vector - dodge's move score
+# weights (examples/dodge.py WEIGHTS) or main's food-race tie rules (main.py
+# FOOD_RACE) - and optimises it with SPSA: every iteration perturbs all
+# parameters at once in a random +/- direction, plays the same seeded games with
+# both perturbed vectors (tuned snake against its own defaults and against the
+# bundled example snakes, spread over worker processes by simulator.py) and
+# steps along the difference in score. SPSA needs two evaluations per step
+# whatever the dimension and copes with the noise of game outcomes.
+#
+# A tuned snake scores 1 for a win and, otherwise, half the share of the game it
+# survived. Parameters are searched in units of their scale around the default,
+# and clipped to their range.
+#
+# The job state (iteration, current vector, history) is rewritten to
+# <job>/state.json after every iteration, and the random directions and game
+# seeds are derived from the iteration number, so a run killed part way through
+# picks up where it stopped with --resume and follows the same path.
+#
+# Usage:
+#   python tune.py --target dodge --job tuning/dodge --iterations 200 --games 64
+#   python tune.py --job tuning/dodge --resume
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import time
+import typing
+
+import simulator
+
+class Parameter(typing.NamedTuple):
+    name: str
+    default: float
+    scale: float  # one search unit
+    low: float
+    high: float
+
+class Target(typing.NamedTuple):
+    module: str
+    attribute: str  # module-level dict holding the parameters
+    parameters: typing.Tuple[Parameter, ...]
+
+TARGETS = {
+    "dodge": Target("examples.dodge", "WEIGHTS", (
+        Parameter("head_dist", 1.0, 1.0, 0.0, 5.0),
+        Parameter("body_dist", 0.4, 0.4, 0.0, 5.0),
+        Parameter("space", 0.15, 0.3, 0.0, 2.0),
+    )),
+    "main": Target("main", "FOOD_RACE", (
+        Parameter("vs_longer", -0.5, 1.0, -3.0, 3.0),
+        Parameter("vs_shorter", 0.5, 1.0, -3.0, 3.0),
+    )),
+}
+
+# Opponent line-ups, played in turn; "base" is the target with its default
+# parameters, and the target's own name means the same
+LINEUPS = ("base", "hungry", "dodge", "circle", "base,hungry,dodge")
+
+# SPSA gain sequences: a_k = a / (k + 1 + A)^ALPHA, c_k = c / (k + 1)^GAMMA
+ALPHA = 0.602
+GAMMA = 0.101
+
+def defaults(target: str) -> typing.Dict[str, float]:
+    return {p.name: p.default for p in TARGETS[target].parameters}
+
+def values_at(target: str, theta: typing.Sequence[float]) -> typing.Dict[str, float]:
+    return {
+        p.name: min(max(p.default + t * p.scale, p.low), p.high)
+        for p, t in zip(TARGETS[target].parameters, theta)
+    }
+
+# Handlers that play the target with `values`; the module's dict is set on every
+# move, so a tuned copy and a default copy can share one game
+def parameterised(target: str, values: typing.Dict[str, float]) -> simulator.Handlers:
+    spec = TARGETS[target]
+    module = importlib.import_module(spec.module)
+    params = getattr(module, spec.attribute)
+
+    def move(game_state: typing.Dict) -> typing.Dict:
+        params.update(values)
+        return module.move(game_state)
+
+    return {"info": module.info, "start": module.start, "move": move, "end": module.end}
+
+def lineup_config(target: str, lineup: str, width: int, height: int, max_turns: int) -> simulator.GameConfig:
+    opponents = tuple("base" if name == target else name for name in lineup.split(","))
+    return simulator.GameConfig(("tuned",) + opponents, "standard", width, height, max_turns)
+
+def game_score(result: simulator.GameResult) -> float:
+    if result.winner == "tuned":
+        return 1.0
+    return 0.5 * result.survived["tuned"] / result.turns if result.turns else 0.0
+
+def _play(args: typing.Tuple[str, typing.Dict[str, float], simulator.GameConfig, int]) -> float:
+    target, values, config, seed = args
+    simulator.register("tuned", parameterised(target, values))
+    simulator.register("base", parameterised(target, defaults(target)))
+    return game_score(simulator.play_game(config, seed))
+
+# Mean score of each parameter set over the same seeded games
+def evaluate(workers, target: str, candidates: typing.Sequence[typing.Dict[str, float]],
+             configs: typing.Sequence[simulator.GameConfig], games: int, seed: int) -> typing.List[float]:
+    jobs = [
+        (target, values, configs[i % len(configs)], seed + i)
+        for values in candidates
+        for i in range(games)
+    ]
+    scores = workers.map(_play, jobs, chunksize=max(len(jobs) // (multiprocessing.cpu_count() * 4), 1))
+    return [sum(scores[j * games:(j + 1) * games]) / games for j in range(len(candidates))]
+
+def new_state(args) -> typing.Dict[str, typing.Any]:
+    dimensions = len(TARGETS[args.target].parameters)
+    return {
+        "target": args.target,
+        "settings": {
+            "iterations": args.iterations,
+            "games": args.games,
+            "lineups": args.lineups,
+            "width": args.width,
+            "height": args.height,
+            "max_turns": args.max_turns,
+            "seed": args.seed,
+            "a": args.a,
+            "c": args.c,
+        },
+        "iteration": 0,
+        "theta": [0.0] * dimensions,
+        "history": [],
+    }
+
+def save_state(path: str, state: typing.Dict[str, typing.Any]):
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def run(state: typing.Dict[str, typing.Any], path: str, workers_count: typing.Optional[int]):
+    target, settings = state["target"], state["settings"]
+    configs = [lineup_config(target, lineup, settings["width"], settings["height"], settings["max_turns"])
+               for lineup in settings["lineups"]]
+    games, iterations = settings["games"], settings["iterations"]
+    stability = iterations / 10
+
+    with multiprocessing.Pool(workers_count or multiprocessing.cpu_count()) as workers:
+        while state["iteration"] < iterations:
+            k = state["iteration"]
+            started = time.perf_counter()
+            a_k = settings["a"] / (k + 1 + stability) ** ALPHA
+            c_k = settings["c"] / (k + 1) ** GAMMA
+            rng = random.Random(settings["seed"] * 1_000_003 + k)
+            delta = [rng.choice((-1.0, 1.0)) for _ in state["theta"]]
+
+            plus = [t + c_k * d for t, d in zip(state["theta"], delta)]
+            minus = [t - c_k * d for t, d in zip(state["theta"], delta)]
+            seed = settings["seed"] + k * games
+            y_plus, y_minus = evaluate(workers, target, [values_at(target, plus), values_at(target, minus)],
+                                       configs, games, seed)
+
+            # Ascend: the score is to be maximised
+            state["theta"] = [t + a_k * (y_plus - y_minus) / (2 * c_k * d) for t, d in zip(state["theta"], delta)]
+            state["iteration"] = k + 1
+            values = values_at(target, state["theta"])
+            state["history"].append({"iteration": k + 1, "plus": y_plus, "minus": y_minus, "values": values})
+            save_state(path, state)
+            print(f"iteration {k + 1}/{iterations}: {y_plus:.3f} / {y_minus:.3f} "
+                  f"({time.perf_counter() - started:.1f}s) {format_values(values)}", flush=True)
+
+def report(state: typing.Dict[str, typing.Any], games: int, workers_count: typing.Optional[int]):
+    target, settings = state["target"], state["settings"]
+    configs = [lineup_config(target, lineup, settings["width"], settings["height"], settings["max_turns"])
+               for lineup in settings["lineups"]]
+    tuned = values_at(target, state["theta"])
+    with multiprocessing.Pool(workers_count or multiprocessing.cpu_count()) as workers:
+        # Seeds past every one used while tuning
+        seed = settings["seed"] + settings["iterations"] * settings["games"]
+        y_tuned, y_default = evaluate(workers, target, [tuned, defaults(target)], configs, games, seed)
+    print(f"tuned   {y_tuned:.3f}  {format_values(tuned)}")
+    print(f"default {y_default:.3f}  {format_values(defaults(target))}")
+    print(f"Set {TARGETS[target].module}.{TARGETS[target].attribute} to the tuned values to use them.")
+
+def format_values(values: typing.Dict[str, float]) -> str:
+    return " ".join(f"{name}={value:.3f}" for name, value in values.items())
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune a snake's heuristic weights by parallel self-play (SPSA).")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="dodge")
+    parser.add_argument("--job", required=True, help="directory for the job state")
+    parser.add_argument("--resume", action="store_true", help="continue the job in --job")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--games", type=int, default=64, help="games per perturbed vector per iteration")
+    parser.add_argument("--lineups", nargs="+", default=list(LINEUPS),
+                        help="comma-separated opponents per line-up; base is the target with default weights")
+    parser.add_argument("--width", type=int, default=11)
+    parser.add_argument("--height", type=int, default=11)
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-a", type=float, default=4.0, help="SPSA step size")
+    parser.add_argument("-c", type=float, default=1.0, help="SPSA perturbation size, in parameter scale units")
+    parser.add_argument("--final-games", type=int, default=256, help="games to compare tuned and default weights")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    args = parser.parse_args()
+
+    path = os.path.join(args.job, "state.json")
+    if args.resume:
+        with open(path) as f:
+            state = json.load(f)
+        print(f"Resuming {state['target']} at iteration {state['iteration']}/{state['settings']['iterations']}")
+    elif os.path.exists(path):
+        parser.error(f"{path} exists; pass --resume to continue it")
+    else:
+        os.makedirs(args.job, exist_ok=True)
+        state = new_state(args)
+        save_state(path, state)
+
+    run(state, path, args.workers)
+    if args.final_games:
+        report(state, args.final_games, args.workers)
+
+if __name__ == "__main__":
+    main()